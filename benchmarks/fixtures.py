@@ -0,0 +1,62 @@
+'''
+Generates the data the benchmarks run on.
+'''
+from django_mc.models import Layout, Region
+from tests.models import Page, TextComponent
+
+
+def create_regions(count):
+    regions = []
+    for i in range(count):
+        regions.append(Region.objects.create(
+            name='Region {0}'.format(i),
+            slug='region-{0}'.format(i),
+            position=i,
+            component_extend_rule=(
+                Region.COMBINE if i % 2 == 0 else Region.OVERWRITE)))
+    Region.objects.clear_cache()
+    return regions
+
+
+def create_page(depth, regions, components):
+    '''
+    Create a page with a chain of ``depth`` layouts. Every layout and the page
+    get ``components`` text components in each of the given regions.
+    '''
+    layout = None
+    for i in range(depth):
+        layout = Layout.objects.create(
+            name='Layout {0}'.format(i),
+            slug='layout-{0}-{1}'.format(depth, i),
+            parent=layout)
+        fill_provider(layout, regions, components)
+    page = Page.objects.create(title='Page', layout=layout)
+    fill_provider(page, regions, components)
+    return page
+
+
+def fill_provider(provider, regions, components):
+    for region in regions:
+        for position in range(components):
+            provider.region_components.create(
+                region=region,
+                component=TextComponent.objects.create(
+                    text='{0} {1}'.format(region.slug, position)),
+                position=position)
+
+
+def create_link_text(pages, links):
+    '''
+    Return a HTML text body with ``links`` object links to the given pages.
+    Every tenth link points to a page that does not exist.
+    '''
+    paragraphs = []
+    for i in range(links):
+        if i % 10 == 9:
+            object_id = 0
+        else:
+            object_id = pages[i % len(pages)].pk
+        paragraphs.append(
+            '<p>Paragraph {0} with <a href="page/{1}">a link</a>.</p>'.format(
+                i, object_id))
+    return '\n'.join(paragraphs)
@@ -0,0 +1,122 @@
+'''
+Import time benchmark for the entry points of django_mc.
+
+Run it from the repository root with::
+
+    python -m benchmarks.imports --budget 300
+
+Every entry point is imported in a fresh interpreter. The benchmark reports
+the import time and fails (exit code 1) if an entry point takes longer than
+the budget or loads one of the heavy modules that shall only be imported on
+first use (BeautifulSoup, lxml and the template machinery). Pass
+``--importtime`` to see the slowest modules (needs Python 3.7 or newer).
+'''
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+# The entry points and the modules they must not import.
+ENTRY_POINTS = (
+    ('django_mc', ('bs4', 'lxml', 'django.template')),
+    ('django_mc.link', ('bs4', 'lxml', 'django.template')),
+    ('django_mc.link.text_filters', ('bs4', 'lxml')),
+)
+
+CHILD = '''
+import json, sys
+from importlib import import_module
+from timeit import default_timer
+before = set(sys.modules)
+started = default_timer()
+import_module({0!r})
+elapsed = default_timer() - started
+print(json.dumps({{
+    'time': elapsed,
+    'modules': sorted(m for m in set(sys.modules) - before if sys.modules[m]),
+}}))
+'''
+
+
+def measure_import(module, importtime=False):
+    '''
+    Import ``module`` in a fresh interpreter. Returns the import time in
+    seconds, the newly loaded modules and the ``-X importtime`` report (or
+    ``None``).
+    '''
+    command = [sys.executable]
+    if importtime:
+        command.extend(['-X', 'importtime'])
+    command.extend(['-c', CHILD.format(module)])
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError('Importing {0} failed:\n{1}'.format(module, stderr))
+    result = json.loads(stdout.strip().splitlines()[-1])
+    return result['time'], result['modules'], stderr if importtime else None
+
+
+def loaded_forbidden(modules, forbidden):
+    return sorted(set(
+        name for name in forbidden
+        for module in modules
+        if module == name or module.startswith(name + '.')))
+
+
+def slowest_modules(report, limit=10):
+    '''
+    Return the ``limit`` modules with the highest cumulative import time
+    from a ``-X importtime`` report.
+    '''
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [part.strip() for part in line[len('import time:'):].split('|')]
+        if parts[1].isdigit():
+            rows.append((int(parts[1]), parts[2]))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=300,
+                        help='Maximum import time per entry point in milliseconds.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of imports per entry point, the fastest counts.')
+    parser.add_argument('--importtime', action='store_true',
+                        help='Show the slowest modules (python -X importtime).')
+    options = parser.parse_args(argv)
+
+    if options.importtime and sys.version_info < (3, 7):
+        parser.error('--importtime needs Python 3.7 or newer.')
+
+    failed = False
+    for module, forbidden in ENTRY_POINTS:
+        times = []
+        for i in range(options.repeat):
+            elapsed, modules, report = measure_import(module, options.importtime)
+            times.append(elapsed)
+        elapsed = min(times) * 1000
+        problems = ['loads ' + name for name in loaded_forbidden(modules, forbidden)]
+        if elapsed > options.budget:
+            problems.append('over budget')
+        failed = failed or bool(problems)
+        print('{0:40} {1:9.3f}ms {2:5d} modules {3}'.format(
+            module, elapsed, len(modules), ', '.join(problems)))
+        if report:
+            for microseconds, name in slowest_modules(report):
+                print('    {0:9.3f}ms {1}'.format(microseconds / 1000.0, name))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
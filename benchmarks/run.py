@@ -0,0 +1,241 @@
+'''
+Benchmarks for the layout and render pipeline of django_mc.
+
+Run them from the repository root with::
+
+    python -m benchmarks.run --output results.json
+
+Every benchmark reports the number of queries, the wall time per run and, if
+``tracemalloc`` is available, the peak memory of one run. Pass a previous
+result file with ``--compare`` to see the changes between two commits.
+'''
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from timeit import default_timer
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+class Environment(object):
+    '''
+    Holds the generated fixture data that is shared between the benchmarks.
+    '''
+
+    def __init__(self, options):
+        from . import fixtures
+
+        self.options = options
+        self.regions = fixtures.create_regions(options.regions)
+        self.page = fixtures.create_page(
+            options.depth, self.regions, options.components)
+        self.link_text = fixtures.create_link_text([self.page], options.links)
+
+    def get_view(self, **kwargs):
+        from django.test import RequestFactory
+        from django_mc.generic.pageview import PageView
+
+        view = PageView(**kwargs)
+        view.request = RequestFactory().get('/')
+        view.object = self.page
+        view.layout = self.page.layout
+        return view
+
+
+@benchmark
+def get_components_for_regions(env):
+    view = env.get_view()
+    return view.get_components_for_regions
+
+
+@benchmark
+def get_components_for_regions_database_ordering(env):
+    view = env.get_view(database_ordering=True)
+    return view.get_components_for_regions
+
+
+@benchmark
+def render_component(env):
+    from django.template.loader import get_template
+
+    template = get_template('bench/page.html')
+    view = env.get_view()
+    context = {
+        'layout': view.layout,
+        'region': view.get_components_for_regions(),
+    }
+    return lambda: template.render(context)
+
+
+@benchmark
+def hinted_include(env):
+    from django.template.loader import get_template
+
+    template = get_template('bench/include.html')
+    context = {'layout': env.page.layout}
+    return lambda: template.render(context)
+
+
+@benchmark
+def convert_link(env):
+    try:
+        from django_mc.link.text_filters import convert_link
+    except ImportError:
+        return None  # BeautifulSoup or django_textformat are not installed
+    return lambda: convert_link(env.link_text)
+
+
+def convert_link_backend(backend):
+    def run(env):
+        from django_mc.link.html_backends import convert_links
+        try:
+            convert_links('', backend)
+        except ImportError:
+            return None  # the parser of the backend is not installed
+        return lambda: convert_links(env.link_text, backend)
+    run.__name__ = 'convert_link_' + backend.replace('.', '_')
+    return benchmark(run)
+
+
+for backend in ('bs4', 'lxml', 'html.parser'):
+    convert_link_backend(backend)
+
+
+@benchmark
+def registry_resolve(env):
+    from django_mc.link import registry
+
+    object_id = env.page.pk
+    return lambda: registry.resolve('page', object_id)
+
+
+def measure(func, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    func()  # warm up caches, e.g. the region cache and template loaders
+
+    with CaptureQueriesContext(connection) as queries:
+        func()
+
+    peak_memory = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    timings = []
+    for i in range(repeat):
+        started = default_timer()
+        func()
+        timings.append(default_timer() - started)
+
+    return {
+        'queries': len(queries),
+        'min_time': min(timings),
+        'mean_time': sum(timings) / len(timings),
+        'peak_memory': peak_memory,
+    }
+
+
+def get_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.STDOUT).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    for name, result in sorted(results.items()):
+        if name not in previous:
+            continue
+        before = previous[name]
+        print('{0:50} {1:+7.1%} time, {2:+d} queries'.format(
+            name,
+            result['min_time'] / before['min_time'] - 1,
+            result['queries'] - before['queries']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=3,
+                        help='Number of layouts in the layout chain.')
+    parser.add_argument('--regions', type=int, default=5,
+                        help='Number of regions.')
+    parser.add_argument('--components', type=int, default=10,
+                        help='Number of components per region and provider.')
+    parser.add_argument('--links', type=int, default=200,
+                        help='Number of object links in the text body.')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Number of timed runs per benchmark.')
+    parser.add_argument('--filter', default='',
+                        help='Only run benchmarks containing this string.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', help='Compare with a previous JSON result file.')
+    options = parser.parse_args(argv)
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django_mc.link import ModelLinkResolver, register
+    from tests.models import Page
+
+    call_command('migrate', verbosity=0, interactive=False)
+    register('page', ModelLinkResolver(Page))
+    env = Environment(options)
+
+    results = {}
+    for func in BENCHMARKS:
+        if options.filter not in func.__name__:
+            continue
+        run = func(env)
+        if run is None:
+            print('{0:50} skipped'.format(func.__name__))
+            continue
+        result = results[func.__name__] = measure(run, options.repeat)
+        print('{0:50} {1:9.3f}ms {2:5d} queries'.format(
+            func.__name__, result['min_time'] * 1000, result['queries']))
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump({
+                'revision': get_revision(),
+                'python': sys.version,
+                'parameters': {
+                    'depth': options.depth,
+                    'regions': options.regions,
+                    'components': options.components,
+                    'links': options.links,
+                    'repeat': options.repeat,
+                },
+                'results': results,
+            }, output, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as previous:
+            compare(results, json.load(previous)['results'])
+
+
+if __name__ == '__main__':
+    main()
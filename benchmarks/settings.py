@@ -0,0 +1,43 @@
+import warnings
+
+from tests.settings import *  # noqa
+
+
+# Like in production, deprecation warnings shall not be part of the timings.
+warnings.simplefilter('ignore', DeprecationWarning)
+warnings.simplefilter('ignore', PendingDeprecationWarning)
+
+DATABASES = {
+    'default': {
+        'NAME': ':memory:',
+        'ENGINE': 'django.db.backends.sqlite3',
+    },
+}
+
+DEBUG = False
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    ('django.template.loaders.locmem.Loader', {
+                        'bench/page.html': (
+                            '{% load django_mc_component_tags %}'
+                            '{% for slug, components in region.items %}'
+                            '{% for component in components %}'
+                            '{% render_component component for components layout %}'
+                            '{% endfor %}'
+                            '{% endfor %}'),
+                        'bench/include.html': (
+                            '{% load django_mc_include_tags %}'
+                            '{% hinted_include "bench/_theme_{hint}.html" "bench/_theme.html" using layout %}'),
+                        'bench/_theme.html': 'theme',
+                        'tests/_textcomponent.html': '<p>{{ object.text }}</p>',
+                    }),
+                ]),
+            ],
+        },
+    },
+]
@@ -1,7 +1,7 @@
 from django import forms
 from django.utils.translation import ugettext_lazy as _
 from django.contrib import admin
-from .models import ComponentBaseMixin, Layout, Region
+from .models import Layout, Region
 
 
 class RegionForm(forms.ModelForm):
@@ -11,21 +11,22 @@ class RegionForm(forms.ModelForm):
             'name',
             'slug',
             'component_extend_rule',
+            'deferred',
             'available_components',)
 
     def clean_available_components(self):
         components = self.cleaned_data['available_components']
         if components:
+            component_content_type_ids = Region.objects.component_content_type_ids()
             for ct in components:
-                model = ct.model_class()
-                if not model or not issubclass(model, ComponentBaseMixin):
+                if ct.pk not in component_content_type_ids:
                     raise forms.ValidationError(_(
                         '{0} is not a valid component.').format(ct))
         return components
 
 
 class RegionAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug',)
+    list_display = ('name', 'slug', 'deferred',)
     filter_horizontal = ('available_components',)
     form = RegionForm
 
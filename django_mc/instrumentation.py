@@ -0,0 +1,197 @@
+'''
+Instrumentation of the layout assembly and the component rendering.
+
+django_mc reports how long the single steps of building a page take to all
+collectors that are active in the current thread. When no collector is active
+a measurement is nothing more than an attribute lookup, so the hooks can stay
+in place in production.
+
+The easiest way to use it is the ``InstrumentationMiddleware``, which
+collects a ``SummaryCollector`` per request and writes it to the
+``Server-Timing`` response header or to the ``django_mc.instrumentation``
+logger (see the ``MC_INSTRUMENTATION_OUTPUT`` setting). You can also activate
+your own collectors::
+
+    collector = SummaryCollector()
+    with collect(collector):
+        response = view(request)
+    print collector.summary()
+'''
+import logging
+import threading
+from contextlib import contextmanager
+from timeit import default_timer
+from .settings import MC_INSTRUMENTATION_OUTPUT
+
+
+logger = logging.getLogger('django_mc.instrumentation')
+
+
+# Resolving the component providers (the layout chain) of a view.
+LAYOUT_CHAIN = 'layout_chain'
+# Fetching the region components of one provider (or of all providers when
+# ``LayoutMixin.database_ordering`` is used).
+COMPONENTS_BY_REGION = 'components_by_region'
+# Resolving region components to the real (polymorphic) component instances.
+RESOLVE_COMPONENT = 'resolve_component'
+# Calling ``Renderable.prepare_batch`` for the components of a page.
+PREPARE_BATCH = 'prepare_batch'
+# Compiling the list of possible template names from the template hints.
+TEMPLATE_NAMES = 'template_names'
+# Searching the first existing template of a list of template names.
+SELECT_TEMPLATE = 'select_template'
+# Rendering one component with ``{% render_component %}``, including nested
+# components.
+RENDER_COMPONENT = 'render_component'
+
+
+class _State(threading.local):
+    collectors = ()
+
+
+_state = _State()
+
+
+def start():
+    '''
+    Start a measurement. Returns ``None`` if no collector is active, pass the
+    return value to ``stop``.
+    '''
+    if _state.collectors:
+        return default_timer()
+    return None
+
+
+def stop(event, started, **info):
+    '''
+    Finish a measurement started with ``start`` and report it to the active
+    collectors. ``info`` may contain additional details, ``count`` is used for
+    measurements that cover multiple items.
+    '''
+    if started is None:
+        return
+    duration = default_timer() - started
+    for collector in _state.collectors:
+        collector.record(event, duration, info)
+
+
+def activate(collector):
+    _state.collectors = _state.collectors + (collector,)
+
+
+def deactivate(collector):
+    _state.collectors = tuple(c for c in _state.collectors if c is not collector)
+
+
+@contextmanager
+def collect(collector):
+    activate(collector)
+    try:
+        yield collector
+    finally:
+        deactivate(collector)
+
+
+class Collector(object):
+    '''
+    Base class for collectors. Subclasses need to implement ``record``.
+    '''
+
+    def record(self, event, duration, info):
+        raise NotImplementedError('record needs to be implemented by subclasses.')
+
+
+class SummaryCollector(Collector):
+    '''
+    Sums up the count and the duration of every event.
+    '''
+
+    def __init__(self):
+        self.events = {}
+
+    def record(self, event, duration, info):
+        try:
+            totals = self.events[event]
+        except KeyError:
+            totals = self.events[event] = [0, 0.0]
+        totals[0] += info.get('count', 1)
+        totals[1] += duration
+
+    def summary(self):
+        '''
+        Return the summary in the ``Server-Timing`` header format, the
+        durations are given in milliseconds::
+
+            layout_chain;dur=0.412;desc="1", render_component;dur=12.300;desc="15"
+        '''
+        return ', '.join(
+            '{0};dur={1:.3f};desc="{2}"'.format(event, total * 1000, count)
+            for event, (count, total) in sorted(self.events.items()))
+
+
+class InstrumentationMiddleware(object):
+    '''
+    Collects the django_mc timings of every request. Add it to your
+    ``MIDDLEWARE_CLASSES`` to enable the instrumentation.
+
+    The components of a streaming response are rendered while its content is
+    consumed, after the headers were sent. So the timings of streaming
+    responses are always logged, once the content is exhausted or the
+    response is closed (see ``TimedStream``).
+    '''
+
+    def process_request(self, request):
+        request._mc_collector = SummaryCollector()
+        activate(request._mc_collector)
+
+    def process_response(self, request, response):
+        collector = getattr(request, '_mc_collector', None)
+        if collector is None:
+            return response
+        del request._mc_collector
+        deactivate(collector)
+        if response.streaming:
+            response.streaming_content = TimedStream(request, response.streaming_content, collector)
+            return response
+        if not collector.events:
+            return response
+        summary = collector.summary()
+        if MC_INSTRUMENTATION_OUTPUT == 'header':
+            response['Server-Timing'] = summary
+        elif MC_INSTRUMENTATION_OUTPUT == 'log':
+            logger.info('%s %s', request.path, summary)
+        return response
+
+
+class TimedStream(object):
+    '''
+    Wraps the content of a streaming response. The collector is only active
+    while the next chunk is produced, the timings are logged when the content
+    is exhausted or when the response is closed, whatever comes first.
+    '''
+
+    def __init__(self, request, content, collector):
+        self.request = request
+        self.content = content
+        self.collector = collector
+        self.closed = False
+
+    def __iter__(self):
+        content = iter(self.content)
+        while True:
+            activate(self.collector)
+            try:
+                chunk = next(content)
+            except StopIteration:
+                break
+            finally:
+                deactivate(self.collector)
+            yield chunk
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.collector.events:
+            logger.info('%s %s', self.request.path, self.collector.summary())
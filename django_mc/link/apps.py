@@ -1,5 +1,7 @@
 from django.apps import AppConfig
 from .autodiscover import autodiscover
+from .registry import registry
+from .settings import MC_LINK_RESOLVERS
 
 
 class LinkAppConfig(AppConfig):
@@ -8,4 +10,6 @@ class LinkAppConfig(AppConfig):
     verbose_name = 'Link'
 
     def ready(self):
-        autodiscover()
+        for object_type, path in MC_LINK_RESOLVERS.items():
+            registry.register(object_type, path)
+        self.autodiscover_timings = autodiscover()
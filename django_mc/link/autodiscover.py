@@ -1,12 +1,30 @@
-from django.conf import settings
+import logging
+import time
+from django.apps import apps
 from django.utils.module_loading import import_module, module_has_submodule
 
 
-def autodiscover():
-    for app in settings.INSTALLED_APPS:
-        mod = import_module(app)
-        try:
-            import_module('%s.%s' % (app, 'link_resolvers'))
-        except:
-            if module_has_submodule(mod, 'link_resolvers'):
-                raise
+logger = logging.getLogger('django_mc.link')
+
+
+def autodiscover(module_name='link_resolvers'):
+    '''
+    Import the ``link_resolvers`` module of every installed app that has one.
+    Apps without the module are skipped without importing anything, errors in
+    existing modules are raised.
+
+    Returns a list of ``(app_label, seconds)`` tuples with the import time of
+    every imported module, they are logged to the ``django_mc.link`` logger
+    as well.
+    '''
+    timings = []
+    for app_config in apps.get_app_configs():
+        if not module_has_submodule(app_config.module, module_name):
+            continue
+        started = time.time()
+        import_module('{0}.{1}'.format(app_config.name, module_name))
+        elapsed = time.time() - started
+        logger.debug(
+            'Imported %s.%s in %.1f ms', app_config.name, module_name, elapsed * 1000)
+        timings.append((app_config.label, elapsed))
+    return timings
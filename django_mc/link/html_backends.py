@@ -0,0 +1,298 @@
+'''
+HTML backends for the ``convert_link`` text filter.
+
+Every backend replaces the object links in the ``href`` attribute of ``<a>``
+tags (like ``page/123``) with the resolved URL. Links that cannot be resolved
+are removed: a link that only contains text (maybe wrapped in a single tag,
+like ``<a><strong>text</strong></a>``) is replaced by its text, all other
+links are removed with their content.
+
+The backend is chosen with the ``MC_LINK_HTML_BACKEND`` setting:
+
+``'bs4'``
+    Parses the HTML with BeautifulSoup and lxml (the default). Top level text
+    is wrapped in a paragraph and the whole value is serialized again.
+``'lxml'``
+    Parses the HTML as fragment with ``lxml.html``.
+``'html.parser'``
+    A streaming rewriter based on the standard library's HTML parser. Only
+    the ``<a>`` tags are changed, everything else is written as it is, so it
+    needs no third party libraries.
+
+All backends give the same result for well formed HTML, but they serialize
+the unchanged markup slightly different (e.g. the order of attributes and
+``<br>`` vs. ``<br/>``). Use ``python -m benchmarks.run --filter convert_link``
+to compare their speed.
+'''
+import re
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from html.parser import HTMLParser
+except ImportError:  # Python 2
+    from HTMLParser import HTMLParser
+
+from .pattern import get_object_reference_regex
+from .registry import ResolveError
+from .settings import MC_LINK_HTML_BACKEND
+
+
+# Elements without an end tag.
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'))
+
+
+def escape_text(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def escape_attribute(value):
+    return escape_text(value).replace('"', '&quot;')
+
+
+def get_href_replacer():
+    '''
+    Return a function that replaces an object link with its URL and raises
+    ``ResolveError`` if the object link cannot be resolved. Other links are
+    returned as they are.
+    '''
+    from .registry import registry
+
+    reference = get_object_reference_regex()
+    reference = re.compile('^{}$'.format(reference.pattern))
+
+    def replace_href(href):
+        return reference.sub(
+            lambda m: registry.resolve(m.group('object_type'), m.group('object_id')),
+            href)
+    return replace_href
+
+
+def convert_links_bs4(value, replace_href):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(value, 'lxml')
+
+    for link in soup.find_all('a'):
+        href = link.get('href')
+        if href:
+            try:
+                link['href'] = replace_href(href)
+            except ResolveError:
+                if link.string:
+                    link.replace_with(link.string)  # remove link completely, but preserve link content (/text)
+                else:
+                    link.replace_with('')  # remove the link completely, it has no reusable content
+
+    return re.sub('^(<html>)?<body>', '', re.sub('</body>(</html>)?$', '', unicode(soup)))
+
+
+def _element_string(element):
+    # Like BeautifulSoup's ``Tag.string``: the text of an element that only
+    # contains text or a single element that only contains text.
+    children = list(element)
+    if not children:
+        return element.text or None
+    if len(children) == 1 and not element.text and not children[0].tail:
+        return _element_string(children[0])
+    return None
+
+
+def _remove_element(element, text=''):
+    text += element.tail or ''
+    parent = element.getparent()
+    previous = element.getprevious()
+    if previous is not None:
+        previous.tail = (previous.tail or '') + text
+    else:
+        parent.text = (parent.text or '') + text
+    parent.remove(element)
+
+
+def convert_links_lxml(value, replace_href):
+    import lxml.html
+
+    root = lxml.html.fragment_fromstring(value, create_parent='div')
+
+    for link in list(root.iter('a')):
+        href = link.get('href')
+        if href:
+            try:
+                link.set('href', replace_href(href))
+            except ResolveError:
+                _remove_element(link, _element_string(link) or '')
+
+    return escape_text(root.text or '') + ''.join(
+        lxml.html.tostring(child, encoding='unicode') for child in root)
+
+
+class LinkRewriter(HTMLParser):
+    '''
+    Writes the parsed HTML back as it is, except for the ``<a>`` tags. The
+    content of links that cannot be resolved is buffered until the link ends,
+    either by its end tag, by the start of another link or by the end tag of
+    an element that contains the link.
+    '''
+
+    def __init__(self, replace_href):
+        HTMLParser.__init__(self)
+        self.replace_href = replace_href
+        self.output = []
+        # The elements that are open outside of a buffered link.
+        self.open_tags = []
+        # The unresolved link that is buffered: a list of ``(kind, output)``
+        # events, and the elements that are open within the link.
+        self.link = None
+        self.link_tags = []
+        self.cdata = False
+
+    def write(self, kind, output):
+        if self.link is None:
+            self.output.append(output)
+        else:
+            self.link.append((kind, output))
+
+    def close_link(self):
+        events, self.link = self.link, None
+        self.link_tags = []
+        self.output.append(get_link_string(events))
+
+    def handle_starttag(self, tag, attrs):
+        raw = self.get_starttag_text()
+        self.cdata = tag in ('script', 'style')
+        if self.link is not None:
+            if tag != 'a':
+                if tag in VOID_ELEMENTS:
+                    self.write('void', raw)
+                else:
+                    self.link_tags.append(tag)
+                    self.write('start', raw)
+                return
+            self.close_link()  # links cannot be nested
+        href = dict(attrs).get('href') if tag == 'a' else None
+        if href:
+            try:
+                href = self.replace_href(href)
+            except ResolveError:
+                self.link = []
+                return
+            raw = '<a{0}>'.format(''.join(
+                ' {0}="{1}"'.format(name, escape_attribute(href if name == 'href' else value or ''))
+                for name, value in attrs))
+        if tag not in VOID_ELEMENTS:
+            self.open_tags.append(tag)
+        self.write('start', raw)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'a' and dict(attrs).get('href'):
+            # A self-closing link is an empty link.
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+        else:
+            self.write('void', self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        self.cdata = False
+        if self.link is not None:
+            if tag in self.link_tags:
+                while self.link_tags.pop() != tag:
+                    self.write('end', '')
+                self.write('end', '</{0}>'.format(tag))
+                return
+            if tag != 'a' and tag not in self.open_tags:
+                return  # a stray end tag
+            self.close_link()
+            if tag == 'a':
+                return
+        if tag in self.open_tags:
+            while self.open_tags.pop() != tag:
+                pass
+        self.write('end', '</{0}>'.format(tag))
+
+    def handle_data(self, data):
+        self.write('text', data if self.cdata else escape_text(data))
+
+    def handle_entityref(self, name):
+        self.write('text', escape_text(self.unescape('&{0};'.format(name))))
+
+    def handle_charref(self, name):
+        self.write('text', escape_text(self.unescape('&#{0};'.format(name))))
+
+    def handle_comment(self, data):
+        self.write('comment', '<!--{0}-->'.format(data))
+
+    def handle_decl(self, decl):
+        self.write('comment', '<!{0}>'.format(decl))
+
+    def handle_pi(self, data):
+        self.write('comment', '<?{0}>'.format(data))
+
+    def close(self):
+        HTMLParser.close(self)
+        if self.link is not None:  # the link was not closed
+            self.close_link()
+        return ''.join(self.output)
+
+
+def get_link_string(events):
+    '''
+    Return the text of a buffered link like ``_element_string`` or an empty
+    string if the link contains more than a single text.
+    '''
+    root = []
+    stack = [root]
+    for kind, output in events:
+        if kind == 'start':
+            element = []
+            stack[-1].append(element)
+            stack.append(element)
+        elif kind == 'end':
+            if len(stack) > 1:
+                stack.pop()
+        elif kind == 'text':
+            children = stack[-1]
+            if children and isinstance(children[-1], basestring):
+                children[-1] += output
+            else:
+                children.append(output)
+        else:  # void elements and comments
+            stack[-1].append([])
+    node = root
+    while len(node) == 1 and isinstance(node[0], list):
+        node = node[0]
+    if len(node) == 1:
+        return node[0]
+    return ''
+
+
+def convert_links_html_parser(value, replace_href):
+    rewriter = LinkRewriter(replace_href)
+    rewriter.feed(value)
+    return rewriter.close()
+
+
+BACKENDS = {
+    'bs4': convert_links_bs4,
+    'lxml': convert_links_lxml,
+    'html.parser': convert_links_html_parser,
+}
+
+
+def get_backend(name=None):
+    if name is None:
+        name = MC_LINK_HTML_BACKEND
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            'Unknown MC_LINK_HTML_BACKEND "{0}", use one of: {1}'.format(
+                name, ', '.join(sorted(BACKENDS))))
+
+
+def convert_links(value, backend=None):
+    '''
+    Replace the object links in ``value`` with their URLs using the given
+    backend (``MC_LINK_HTML_BACKEND`` by default).
+    '''
+    return get_backend(backend)(value, get_href_replacer())
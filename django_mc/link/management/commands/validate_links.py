@@ -0,0 +1,67 @@
+import csv
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.encoding import force_bytes
+from django_mc.link.validation import find_broken_links, get_link_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Check the link fields of the given models and write the broken links '
+        'as CSV (model, pk, field, value, reason).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='+',
+            help='Models to check, like "pages.Page", or single link fields, '
+                 'like "pages.Page.link".')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of objects that are fetched and checked at once.')
+        parser.add_argument(
+            '-o', '--output',
+            help='File to write the CSV to, defaults to stdout.')
+
+    def get_targets(self, labels):
+        targets = []
+        for label in labels:
+            parts = label.split('.')
+            if len(parts) not in (2, 3):
+                raise CommandError('Invalid model "{0}".'.format(label))
+            try:
+                model = apps.get_model(parts[0], parts[1])
+            except LookupError as e:
+                raise CommandError(e)
+            link_fields = get_link_fields(model)
+            if len(parts) == 3:
+                if parts[2] not in link_fields:
+                    raise CommandError('{0} is no link field.'.format(label))
+                link_fields = [parts[2]]
+            elif not link_fields:
+                raise CommandError('{0} has no link fields.'.format(label))
+            targets.append((model, link_fields))
+        return targets
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        targets = self.get_targets(options['models'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                count = self.write_broken_links(output, targets, options['chunk_size'])
+        else:
+            count = self.write_broken_links(self.stdout, targets, options['chunk_size'])
+        if options['verbosity'] > 0:
+            self.stderr.write('Found {0} broken links.'.format(count))
+
+    def write_broken_links(self, output, targets, chunk_size):
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(['model', 'pk', 'field', 'value', 'reason'])
+        count = 0
+        for model, fields in targets:
+            label = '{0}.{1}'.format(model._meta.app_label, model._meta.object_name)
+            queryset = model._default_manager.all()
+            for broken_link in find_broken_links(queryset, fields, chunk_size):
+                writer.writerow([force_bytes(value) for value in (label,) + broken_link])
+                count += 1
+        return count
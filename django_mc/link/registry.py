@@ -1,3 +1,6 @@
+from django.utils.module_loading import import_string
+
+
 TYPE_ID_SEPARATOR = '/'
 
 
@@ -14,24 +17,53 @@ class Registry(object):
         self._registry = {}
 
     def register(self, object_type, object_resolver):
+        '''
+        Register ``object_resolver`` for links of ``object_type``. The
+        resolver may be given as dotted path to a ``LinkResolver`` instance or
+        class, it is imported when it is needed the first time.
+        '''
         self._registry[object_type] = object_resolver
 
+    def get_resolver(self, object_type):
+        object_resolver = self._registry[object_type]
+        if isinstance(object_resolver, basestring):
+            object_resolver = import_string(object_resolver)
+            if isinstance(object_resolver, type):
+                object_resolver = object_resolver()
+            self._registry[object_type] = object_resolver
+        return object_resolver
+
     def resolve(self, object_type, object_id):
         if object_type not in self._registry:
             raise ResolveError('module not registered (%s)' % object_type)
+        object_resolver = self.get_resolver(object_type)
         try:
-            return self._registry[object_type].resolve(object_id)
+            return object_resolver.resolve(object_id)
         except:
             raise ResolveError('module could not handle resolve, type {0}, id {1}'.format(object_type, object_id))
 
     def reverse(self, obj):
-        for object_type, object_resolver in self._registry.items():
+        '''
+        Return the object link for ``obj``. The resolvers that were not
+        imported yet are only imported if none of the others handles ``obj``.
+        '''
+        lazy_types = []
+        for object_type, object_resolver in list(self._registry.items()):
+            if isinstance(object_resolver, basestring):
+                lazy_types.append(object_type)
+            elif object_resolver.handles(obj):
+                return self._reverse(object_type, object_resolver, obj)
+        for object_type in lazy_types:
+            object_resolver = self.get_resolver(object_type)
             if object_resolver.handles(obj):
-                return TYPE_ID_SEPARATOR.join((
-                    unicode(object_type),
-                    unicode(object_resolver.get_object_id(obj))))
+                return self._reverse(object_type, object_resolver, obj)
         raise ReverseResolveError(
             'no object resolver found for object: {0}'.format(repr(obj)))
 
+    def _reverse(self, object_type, object_resolver, obj):
+        return TYPE_ID_SEPARATOR.join((
+            unicode(object_type),
+            unicode(object_resolver.get_object_id(obj))))
+
 
 registry = Registry()
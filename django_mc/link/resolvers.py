@@ -1,4 +1,6 @@
-from django.shortcuts import _get_queryset
+from django.core.exceptions import ValidationError
+from django.db.models import Manager
+from django.db.models.query import QuerySet
 
 
 __all__ = ('LinkResolver', 'ModelLinkResolver',)
@@ -14,10 +16,29 @@ class LinkResolver(object):
     def get_object_id(self, obj):
         raise NotImplementedError('get_object_id needs to be implemented by subclasses.')
 
+    def existing_ids(self, object_ids):
+        '''
+        Return the subset of ``object_ids`` that can be resolved. Override
+        this to check many ids at once, the default resolves every id.
+        '''
+        existing = set()
+        for object_id in object_ids:
+            try:
+                self.resolve(object_id)
+            except Exception:
+                continue
+            existing.add(object_id)
+        return existing
+
 
 class ModelLinkResolver(LinkResolver):
     def __init__(self, model_or_qs):
-        self.queryset = _get_queryset(model_or_qs)
+        if isinstance(model_or_qs, QuerySet):
+            self.queryset = model_or_qs
+        elif isinstance(model_or_qs, Manager):
+            self.queryset = model_or_qs.all()
+        else:
+            self.queryset = model_or_qs._default_manager.all()
         self.model = self.queryset.model
 
     def resolve(self, object_id):
@@ -28,3 +49,19 @@ class ModelLinkResolver(LinkResolver):
 
     def get_object_id(self, obj):
         return obj.pk
+
+    def existing_ids(self, object_ids):
+        '''
+        Check all ids with one query.
+        '''
+        pk_field = self.model._meta.pk
+        ids_by_pk = {}
+        for object_id in object_ids:
+            try:
+                ids_by_pk.setdefault(pk_field.to_python(object_id), []).append(object_id)
+            except ValidationError:
+                continue
+        existing = set()
+        for pk in self.queryset.filter(pk__in=list(ids_by_pk)).values_list('pk', flat=True):
+            existing.update(ids_by_pk[pk])
+        return existing
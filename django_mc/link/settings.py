@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+# Link resolvers that are imported when a link of their type is resolved the
+# first time, e.g. ``{'page': 'pages.link_resolvers.page_resolver'}``. The
+# dotted path may point to a ``LinkResolver`` instance or class.
+MC_LINK_RESOLVERS = getattr(settings, 'MC_LINK_RESOLVERS', {})
+
+# The HTML parser used by the ``convert_link`` text filter, one of ``'bs4'``,
+# ``'lxml'`` and ``'html.parser'`` (see ``django_mc.link.html_backends``).
+MC_LINK_HTML_BACKEND = getattr(settings, 'MC_LINK_HTML_BACKEND', 'bs4')
@@ -0,0 +1,94 @@
+'''
+Bulk validation of the ``LinkField`` values of a queryset, used by the
+``validate_links`` management command.
+
+``Link.exists`` resolves one link with one query. ``find_broken_links``
+instead fetches the values in chunks, paged by primary key (``iterator()``
+does not stream on every database backend), and checks every chunk at once:
+the syntax of every value is checked with ``LINK_REFERENCE_REGEX`` and the
+object links of a chunk are grouped by type, so their existence is checked
+with one query per type (see ``LinkResolver.existing_ids``). Only the current
+chunk is kept in memory.
+'''
+from collections import namedtuple
+from .fields import LinkField
+from .pattern import LINK_REFERENCE_REGEX
+from .registry import registry
+
+
+INVALID = 'invalid'
+UNKNOWN_TYPE = 'unknown type'
+MISSING = 'missing'
+
+
+BrokenLink = namedtuple('BrokenLink', ('pk', 'field', 'value', 'reason'))
+
+
+def get_link_fields(model):
+    return [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, LinkField)]
+
+
+def check_links(rows):
+    '''
+    Check the ``(pk, field, value)`` tuples in ``rows`` and return a list of
+    ``BrokenLink`` tuples for the broken ones, in the order of ``rows``.
+    '''
+    problems = {}
+    references = {}
+    for index, (pk, field, value) in enumerate(rows):
+        match = LINK_REFERENCE_REGEX.match(value)
+        if not match:
+            problems[index] = INVALID
+            continue
+        object_type = match.group('object_type')
+        if object_type is None:
+            continue  # an URL or a path
+        if object_type not in registry._registry:
+            problems[index] = UNKNOWN_TYPE
+            continue
+        references.setdefault(object_type, {}).setdefault(
+            match.group('object_id'), []).append(index)
+
+    for object_type, indexes_by_id in references.items():
+        existing = registry.get_resolver(object_type).existing_ids(list(indexes_by_id))
+        for object_id, indexes in indexes_by_id.items():
+            if object_id not in existing:
+                for index in indexes:
+                    problems[index] = MISSING
+
+    return [
+        BrokenLink(rows[index][0], rows[index][1], rows[index][2], problems[index])
+        for index in sorted(problems)]
+
+
+def find_broken_links(queryset, fields=None, chunk_size=1000):
+    '''
+    Yield a ``BrokenLink`` for every broken value of the given link fields
+    (all ``LinkField`` fields of the model by default) in ``queryset``, in
+    the order of the primary keys. The objects are fetched ``chunk_size`` at
+    a time. Empty values are skipped.
+    '''
+    if fields is None:
+        fields = get_link_fields(queryset.model)
+    if not fields:
+        return
+    queryset = queryset.order_by('pk').values_list('pk', *fields)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        rows = []
+        for values in chunk:
+            pk = values[0]
+            for field, value in zip(fields, values[1:]):
+                if value:
+                    rows.append((pk, field, value))
+        for broken_link in check_links(rows):
+            yield broken_link
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]
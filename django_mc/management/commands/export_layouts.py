@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django_mc.serialization import export_layouts
+
+
+class Command(BaseCommand):
+    help = (
+        'Export the regions, layouts and the region components of the layouts '
+        'as JSON Lines.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='File to write the export to, defaults to stdout.')
+
+    def handle(self, *args, **options):
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                export_layouts(output)
+        else:
+            export_layouts(self.stdout)
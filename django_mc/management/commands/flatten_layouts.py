@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_mc.serialization import get_layout_model
+
+
+class Command(BaseCommand):
+    help = (
+        'Flatten the given layouts, i.e. copy the components of their parent '
+        'layouts into them. Without arguments all flattened layouts are synced '
+        'with their parents, run this regularly or after changing layouts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'slugs', nargs='*',
+            help='Slugs of the layouts to flatten.')
+        parser.add_argument(
+            '--unflatten', action='store_true', default=False,
+            help='Remove the copied components of the given layouts instead.')
+
+    def handle(self, *args, **options):
+        Layout = get_layout_model()
+        slugs = options['slugs']
+        layouts = list(Layout.objects.filter(slug__in=slugs))
+        missing = set(slugs) - set(layout.slug for layout in layouts)
+        if missing:
+            raise CommandError('Unknown layouts: {0}'.format(', '.join(sorted(missing))))
+
+        if options['unflatten']:
+            if not layouts:
+                raise CommandError('Pass the slugs of the layouts to unflatten.')
+            for layout in layouts:
+                layout.unflatten()
+            self.stdout.write('Unflattened {0} layouts.'.format(len(layouts)))
+            return
+
+        if layouts:
+            Layout.objects.filter(pk__in=[layout.pk for layout in layouts]).update(
+                flattened=True)
+        synced = Layout.objects.sync_flattened(layouts or None)
+        self.stdout.write('Flattened {0} layouts.'.format(len(synced)))
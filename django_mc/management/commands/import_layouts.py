@@ -0,0 +1,32 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django_mc.serialization import LayoutImportError, import_layouts
+
+
+class Command(BaseCommand):
+    help = (
+        'Import regions, layouts and the region components of the layouts '
+        'from JSON Lines written by export_layouts. The region components of '
+        'the imported layouts are replaced.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            help='File to import, use "-" to read from stdin.')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of region components that are created at once.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['input'] == '-':
+                counts = import_layouts(sys.stdin, batch_size=options['batch_size'])
+            else:
+                with open(options['input']) as lines:
+                    counts = import_layouts(lines, batch_size=options['batch_size'])
+        except LayoutImportError as e:
+            raise CommandError(e)
+        self.stdout.write(
+            'Imported {region} regions, {layout} layouts and {region_component} '
+            'region components, skipped {skipped} region components with '
+            'missing components.'.format(**counts))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_mc import warmup
+from django_mc.models import get_region_component_cache
+from django_mc.settings import MC_LAYOUT_MODEL
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the region component cache (MC_REGION_COMPONENT_CACHE) for all '
+        'layouts and the objects of the given component provider models, '
+        'e.g. after a deploy. The cache must be shared between processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*',
+            help='Additional component provider models, like "pages.Page".')
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Number of worker processes.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=100,
+            help='Number of objects that are warmed by one task.')
+
+    def handle(self, *args, **options):
+        cache = get_region_component_cache()
+        if cache is None:
+            raise CommandError(
+                'MC_REGION_COMPONENT_CACHE is not set, there is nothing to warm.')
+        if not warmup.is_shared_cache(cache):
+            raise CommandError(
+                'The cache of MC_REGION_COMPONENT_CACHE is not shared between '
+                'processes ({0}), the server processes would not see the warmed '
+                'entries.'.format(type(cache).__name__))
+        if options['processes'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--processes and --chunk-size must be positive.')
+        labels = [MC_LAYOUT_MODEL] + options['models']
+        try:
+            for label in labels:
+                warmup.get_provider_model(label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+
+        verbosity = options['verbosity']
+
+        def progress(done, total):
+            if verbosity > 0:
+                self.stdout.write('Warmed {0}/{1} objects.'.format(done, total))
+
+        count = warmup.warm_providers(
+            labels,
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+            progress=progress)
+        self.stdout.write('Warmed the region components of {0} objects.'.format(count))
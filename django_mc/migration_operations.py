@@ -7,16 +7,42 @@ ALL_REGIONS = object()
 class _ManageComponentTypeInRegions(migrations.RunPython):
     """
     Requires all migrations of ``django.contrib.contenttypes`` to be applied.
+
+    ``component_model`` may also be a list of model names to manage multiple
+    component types of the app at once. The rows of the
+    ``Region.available_components`` table are inserted with a single
+    ``bulk_create`` (existing pairs are skipped) and deleted with a single
+    query.
+
+    Pass ``elidable=True`` to allow dropping the operation when the
+    migrations are squashed (supported by Django 1.10 and later).
     """
 
     def __init__(self, component_app_label, component_model,
-                 regions=ALL_REGIONS):
+                 regions=ALL_REGIONS, elidable=False):
         self.component_app_label = component_app_label
         self.component_model = component_model
         self.regions = regions
         super(_ManageComponentTypeInRegions, self).__init__(
             self.run_forwards,
             self.run_backwards)
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {}
+        if self.regions is not ALL_REGIONS:
+            kwargs['regions'] = self.regions
+        if self.elidable:
+            kwargs['elidable'] = self.elidable
+        return (
+            self.__class__.__name__,
+            [self.component_app_label, self.component_model],
+            kwargs)
+
+    def get_component_model_names(self):
+        if isinstance(self.component_model, basestring):
+            return [self.component_model.lower()]
+        return [model.lower() for model in self.component_model]
 
     def get_content_type_model(self, apps):
         return apps.get_model('contenttypes', 'ContentType')
@@ -24,12 +50,20 @@ class _ManageComponentTypeInRegions(migrations.RunPython):
     def get_region_model(self, apps):
         return apps.get_model('django_mc', 'Region')
 
-    def get_component_content_type(self, apps):
+    def get_component_content_types(self, apps):
         ContentType = self.get_content_type_model(apps)
-        content_type, created = ContentType.objects.get_or_create(
-            app_label=self.component_app_label,
-            model=self.component_model)
-        return content_type
+        model_names = self.get_component_model_names()
+        content_types = dict(
+            (content_type.model, content_type)
+            for content_type in ContentType.objects.filter(
+                app_label=self.component_app_label,
+                model__in=model_names))
+        for model_name in model_names:
+            if model_name not in content_types:
+                content_types[model_name] = ContentType.objects.create(
+                    app_label=self.component_app_label,
+                    model=model_name)
+        return [content_types[model_name] for model_name in model_names]
 
     def get_regions(self, apps):
         Region = self.get_region_model(apps)
@@ -38,15 +72,53 @@ class _ManageComponentTypeInRegions(migrations.RunPython):
         else:
             return Region.objects.filter(slug__in=self.regions)
 
+    def get_through_model(self, apps):
+        """
+        Return the through model of ``Region.available_components`` and the
+        names of its region and content type columns.
+        """
+        field = self.get_region_model(apps)._meta.get_field('available_components')
+        through = field.rel.through
+        return (
+            through,
+            through._meta.get_field(field.m2m_field_name()).attname,
+            through._meta.get_field(field.m2m_reverse_field_name()).attname)
+
+    def get_available_components_rows(self, apps):
+        through, region_attname, content_type_attname = self.get_through_model(apps)
+        region_ids = list(self.get_regions(apps).values_list('pk', flat=True))
+        content_type_ids = [
+            content_type.pk
+            for content_type in self.get_component_content_types(apps)]
+        return through._default_manager.filter(**{
+            region_attname + '__in': region_ids,
+            content_type_attname + '__in': content_type_ids,
+        }), region_ids, content_type_ids
+
     def add_to_regions(self, apps):
-        content_type = self.get_component_content_type(apps)
-        for region in self.get_regions(apps):
-            region.available_components.add(content_type)
+        through, region_attname, content_type_attname = self.get_through_model(apps)
+        rows, region_ids, content_type_ids = self.get_available_components_rows(apps)
+        existing = set(rows.values_list(region_attname, content_type_attname))
+        through._default_manager.bulk_create([
+            through(**{
+                region_attname: region_id,
+                content_type_attname: content_type_id,
+            })
+            for region_id in region_ids
+            for content_type_id in content_type_ids
+            if (region_id, content_type_id) not in existing
+        ])
+        self.clear_available_components_cache()
 
     def remove_from_regions(self, apps):
-        content_type = self.get_component_content_type(apps)
-        for region in self.get_regions(apps):
-            region.available_components.remove(content_type)
+        rows, region_ids, content_type_ids = self.get_available_components_rows(apps)
+        rows.delete()
+        self.clear_available_components_cache()
+
+    def clear_available_components_cache(self):
+        # Changing the through table directly doesn't send m2m_changed.
+        from django_mc.models import Region
+        Region.objects.clear_available_components_cache()
 
     def run_forwards(self):
         raise NotImplementedError()
@@ -70,7 +142,13 @@ class AddComponentTypeToRegions(_ManageComponentTypeInRegions):
                 AddComponentTypeToRegions(
                     'my_other_component_app',
                     'SecondComponentModel',
-                )
+                ),
+                # Add multiple component types of an app at once.
+                AddComponentTypeToRegions(
+                    'my_third_component_app',
+                    ['ThirdComponentModel', 'FourthComponentModel'],
+                    regions=['main'],
+                ),
             ]
     """
     def run_forwards(self, apps, schema_editor):
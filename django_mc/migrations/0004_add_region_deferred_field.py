@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mc', '0003_add_region_position_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='region',
+            name='deferred',
+            field=models.BooleanField(default=False, help_text='Deferred regions are not rendered with the page but loaded separately, e.g. with an edge side include.'),
+        ),
+    ]
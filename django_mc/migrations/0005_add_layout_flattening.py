@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mc', '0004_add_region_deferred_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='layout',
+            name='flattened',
+            field=models.BooleanField(default=False, help_text='Flattened layouts store the components of their parent layouts themselves.', editable=False),
+        ),
+        migrations.AddField(
+            model_name='layoutregioncomponent',
+            name='inherited',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
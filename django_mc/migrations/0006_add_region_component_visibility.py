@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mc', '0005_add_layout_flattening'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='layoutregioncomponent',
+            name='visible_from',
+            field=models.DateTimeField(db_index=True, null=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='layoutregioncomponent',
+            name='visible_until',
+            field=models.DateTimeField(db_index=True, null=True, blank=True),
+        ),
+    ]
@@ -1,8 +1,49 @@
-from django.template import Context, Template
+import re
 
 
 __all__ = ('TemplateHintProvider', 'CompositeTemplateHintProvider',
-           'TemplateNameProvider', 'Renderable',)
+           'TemplateNameProvider', 'Renderable', 'prepare_batches',)
+
+
+# Matches template names that use the ``object`` variable, their result may
+# differ for every object and cannot be cached.
+OBJECT_VARIABLE_REGEX = re.compile(r'\bobject\b')
+
+_compiled_template_names = {}
+_template_name_tables = {}
+
+
+def _get_template_name_table(template_name, app_label, object_name, kwargs):
+    '''
+    Return the dict that maps hints to generated template names for the
+    given arguments or ``None`` if the keyword arguments are unhashable.
+    '''
+    try:
+        key = (template_name, app_label, object_name, frozenset(
+            item for item in kwargs.items() if item[0] != 'hint'))
+        return _template_name_tables.setdefault(key, {})
+    except TypeError:  # unhashable keyword arguments
+        return None
+
+
+def _compile_template_name(template_name):
+    '''
+    Return a function that renders ``template_name`` with a context dict and
+    whether ``template_name`` uses the ``object`` variable.
+    '''
+    try:
+        return _compiled_template_names[template_name]
+    except KeyError:
+        # The template machinery is only imported when it is used the first
+        # time, so importing django_mc stays cheap.
+        from django.template import Context, Template
+        template = Template(template_name)
+
+        def render(context):
+            return template.render(Context(context))
+        compiled = _compiled_template_names[template_name] = (
+            render, bool(OBJECT_VARIABLE_REGEX.search(template_name)))
+        return compiled
 
 
 class TemplateHintProvider(object):
@@ -10,6 +51,8 @@ class TemplateHintProvider(object):
     Use this mixin for objects which shall provide template hints.
     '''
 
+    __slots__ = ()
+
     def get_template_hints(self, name_provider, hint_providers):
         '''
         Return a list of strings that indicate hints that should be appended
@@ -42,14 +85,10 @@ class TemplateHintProvider(object):
         instance of ``Renderable``) which takes a hint as an argument and
         returns the hinted template name.
         '''
-        template_names = []
-        for hint in self.get_template_hints(name_provider, hint_providers):
-            if hint:
-                template_names.append(
-                    name_provider.get_template_name(
-                        hint=hint,
-                        **kwargs))
-        return template_names
+        return [
+            name_provider.get_template_name(hint=hint, **kwargs)
+            for hint in self.get_template_hints(name_provider, hint_providers)
+            if hint]
 
 
 class CompositeTemplateHintProvider(list):
@@ -57,13 +96,17 @@ class CompositeTemplateHintProvider(list):
     Can be used as a composite of multiple TemplateHintProviders. That's
     useful if you want to group the providers into a list. It's used for
     example in the ``{% render_content %}`` template tag.
+
+    The composite always asks its own members, ``hint_providers`` is only
+    passed on to them. That way a composite can itself be one of the
+    ``hint_providers`` without asking the other providers again.
     '''
 
     def get_template_hints(self, name_provider, hint_providers=None):
         if hint_providers is None:
             hint_providers = self
         template_hints = []
-        for hint_provider in hint_providers:
+        for hint_provider in self:
             template_hints.extend(
                 hint_provider.get_template_hints(name_provider, hint_providers))
         return template_hints
@@ -72,7 +115,7 @@ class CompositeTemplateHintProvider(list):
         if hint_providers is None:
             hint_providers = self
         context_data = {}
-        for hint_provider in hint_providers:
+        for hint_provider in self:
             context_data.update(
                 hint_provider.suggest_context_data(name_provider, hint_providers))
         return context_data
@@ -81,7 +124,7 @@ class CompositeTemplateHintProvider(list):
         if hint_providers is None:
             hint_providers = self
         template_names = []
-        for hint_provider in hint_providers:
+        for hint_provider in self:
             template_names.extend(
                 hint_provider.suggest_template_names(
                     name_provider,
@@ -141,35 +184,60 @@ class TemplateNameProvider(object):
         as widget inside a wrapping page.
 
         The ``hint`` is a template hint given by a used TemplateHintProvider.
+
+        As long as ``template_name`` doesn't use the ``object`` variable, the
+        generated names are kept in a table per app label, object name and
+        keyword arguments, so every hint is only rendered once.
         '''
         if template_name is None:
             template_name = self.template_name
 
+        app_label = self.get_app_label()
+        object_name = self.get_model_name()
+        render, uses_object = _compile_template_name(template_name)
+        table = None
+        if not uses_object:
+            table = _get_template_name_table(template_name, app_label, object_name, kwargs)
+        if table is not None:
+            try:
+                return table[kwargs.get('hint')]
+            except KeyError:
+                pass
+
         context = {
-            'app_label': self.get_app_label(),
-            'object_name': self.get_model_name(),
+            'app_label': app_label,
+            'object_name': object_name,
             'object': self,
         }
         context.update(kwargs)
-        template = Template(template_name)
-        return template.render(Context(context))
+        generated_name = render(context)
+        if table is not None:
+            table[kwargs.get('hint')] = generated_name
+        return generated_name
 
-    def get_template_names(self, hint_providers, **kwargs):
+    def get_template_names(self, hint_providers, max_hints=None, **kwargs):
         '''
         Compile a list of template names for which the first existing one
         shall be used to render the object. You can provide a list of
         ``TemplateHintProvider``s that will be taken into account.
 
+        ``max_hints`` limits the number of hinted template names, the hint
+        providers after the limit is reached are not asked anymore.
+
         All extra keyword arguments will be passed down to
         ``get_template_name``.
         '''
         template_names = []
         for hint_provider in hint_providers:
+            if max_hints is not None and len(template_names) >= max_hints:
+                break
             template_names.extend(
                 hint_provider.suggest_template_names(
                     self,
                     hint_providers=hint_providers,
                     **kwargs))
+        if max_hints is not None:
+            del template_names[max_hints:]
         # Add a template name without a hint as a fallback.
         template_names.append(
             self.get_template_name(**kwargs))
@@ -191,6 +259,20 @@ class Renderable(TemplateNameProvider):
             return self.context_object_name
         return self.get_model_name()
 
+    @classmethod
+    def prepare_batch(cls, components, request_context):
+        '''
+        Called once with all instances of this class that will be rendered on
+        a page, before ``get_context_data`` is called for any of them. Override
+        this to fetch related data (images, linked pages, counts, ...) for all
+        components with a constant number of queries and store it on the
+        instances.
+
+        ``request_context`` is the context data of the rendering view (see
+        ``prepare_batches``).
+        '''
+        pass
+
     def get_context_data(self, **kwargs):
         '''
         Give the context that shall be used to render the object's template.
@@ -199,3 +281,18 @@ class Renderable(TemplateNameProvider):
             self.get_context_object_name(): self,
             'object': self,
         }
+
+
+def prepare_batches(components, request_context=None):
+    '''
+    Group the given components by class and call ``prepare_batch`` once for
+    every class. Objects without a ``prepare_batch`` method are ignored.
+    ``LayoutMixin`` calls this for all components of the page, use it
+    yourself if you render components in another way.
+    '''
+    components_by_class = {}
+    for component in components:
+        if hasattr(component, 'prepare_batch'):
+            components_by_class.setdefault(type(component), []).append(component)
+    for component_class, class_components in components_by_class.iteritems():
+        component_class.prepare_batch(class_components, request_context)
@@ -1,11 +1,23 @@
 # -*- coding: utf-8 -*-
+from itertools import chain
+from math import ceil
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import ValidationError
+from django.db import connections
 from django.db import models
+from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django_deferred_polymorph.models import SubDeferredPolymorphBaseModel
 from .mixins import Renderable
 from .mixins import TemplateHintProvider
 from .settings import MC_COMPONENT_BASE_MODEL
+from .settings import MC_REGION_COMPONENT_CACHE
+from .settings import MC_REGION_COMPONENT_CACHE_TIMEOUT
+from .signals import region_components_changed
 
 
 class RegionManager(models.Manager):
@@ -46,6 +58,77 @@ class RegionManager(models.Manager):
             del self._region_pk_to_slug
         except AttributeError:
             pass
+        self.clear_available_components_cache()
+
+    def available_content_type_ids(self):
+        '''
+        Return a dict that maps the region pks to a set of the content type
+        ids of their available components.
+        '''
+        try:
+            return self._available_content_type_ids
+        except AttributeError:
+            self.fill_available_components_cache()
+            return self._available_content_type_ids
+
+    def available_models(self):
+        '''
+        Return a dict that maps the region pks to a list of the model classes
+        of their available components.
+        '''
+        try:
+            return self._available_models
+        except AttributeError:
+            self.fill_available_components_cache()
+            return self._available_models
+
+    def fill_available_components_cache(self):
+        field = self.model._meta.get_field('available_components')
+        rows = field.rel.through._default_manager.order_by('pk').values_list(
+            field.m2m_field_name(), field.m2m_reverse_field_name())
+        content_type_ids = {}
+        for region_id, content_type_id in rows:
+            content_type_ids.setdefault(region_id, []).append(content_type_id)
+        content_types = ContentType.objects.in_bulk(
+            set(chain.from_iterable(content_type_ids.itervalues())))
+        available_models = {}
+        for region_id, ids in content_type_ids.iteritems():
+            region_models = available_models[region_id] = []
+            for content_type_id in ids:
+                model = content_types[content_type_id].model_class()
+                if model is not None:
+                    region_models.append(model)
+        self._available_content_type_ids = dict(
+            (region_id, frozenset(ids))
+            for region_id, ids in content_type_ids.iteritems())
+        self._available_models = available_models
+
+    def clear_available_components_cache(self):
+        try:
+            del self._available_content_type_ids
+            del self._available_models
+        except AttributeError:
+            pass
+        try:
+            del self._component_content_type_ids
+        except AttributeError:
+            pass
+
+    def component_content_type_ids(self):
+        '''
+        Return the ids of the content types of all component models,
+        including proxy models. Cached with the available components.
+        '''
+        try:
+            return self._component_content_type_ids
+        except AttributeError:
+            component_models = [
+                model for model in apps.get_models()
+                if issubclass(model, ComponentBaseMixin)]
+            self._component_content_type_ids = frozenset(
+                content_type.pk for content_type in ContentType.objects.get_for_models(
+                    *component_models, for_concrete_models=False).itervalues())
+            return self._component_content_type_ids
 
 
 class Region(TemplateHintProvider, models.Model):
@@ -64,6 +147,11 @@ class Region(TemplateHintProvider, models.Model):
             'Define how page components that is added to this region change '
             'the layout components.'))
     position = models.IntegerField(default=0)
+    deferred = models.BooleanField(
+        default=False,
+        help_text=_(
+            'Deferred regions are not rendered with the page but loaded '
+            'separately, e.g. with an edge side include.'))
     available_components = models.ManyToManyField('contenttypes.ContentType')
 
     objects = RegionManager()
@@ -101,22 +189,399 @@ class Region(TemplateHintProvider, models.Model):
                 combined.extend(second)
             return combined
 
+    def extend_component_rows(self, rows):
+        '''
+        Apply the ``component_extend_rule`` to the rows of all component
+        providers at once, as returned by ``region_component_rows``. The third
+        item of every row is the depth of the provider it comes from, deeper
+        providers extend the ones before them. The order of ``rows`` is kept.
+        '''
+        if self.component_extend_rule == self.OVERWRITE:
+            rows = list(rows)
+            if not rows:
+                return rows
+            max_depth = max(row[2] for row in rows)
+            return [row for row in rows if row[2] == max_depth]
+        elif self.component_extend_rule == self.COMBINE:
+            return list(rows)
+
     def get_valid_component_models(self):
-        return [
-            content_type.model_class
-            for content_type in self.available_components.all()
-        ]
+        return list(type(self).objects.available_models().get(self.pk, ()))
+
+    def accepts(self, component):
+        '''
+        Return whether ``component`` (a component instance or model) may be
+        added to this region. The available components of all regions are
+        cached (see ``RegionManager.available_models``), so no query is
+        needed. A proxy model is accepted if either the proxy itself or its
+        concrete model is available.
+        '''
+        manager = type(self).objects
+        available_models = manager.available_models().get(self.pk, ())
+        model = component if isinstance(component, type) else type(component)
+        if model in available_models:
+            return True
+        content_type_id = getattr(component, '_poly_ct_id', None)
+        if content_type_id is not None:
+            return content_type_id in manager.available_content_type_ids().get(self.pk, ())
+        return model._meta.concrete_model in available_models
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+def get_region_component_cache():
+    '''
+    Return the cache configured by ``MC_REGION_COMPONENT_CACHE`` or ``None``
+    if the region components are not cached.
+    '''
+    if MC_REGION_COMPONENT_CACHE is None:
+        return None
+    from django.core.cache import caches
+    return caches[MC_REGION_COMPONENT_CACHE]
+
+
+def region_components_cache_key(model, provider_id):
+    return 'django_mc:region_components:{0}.{1}:{2}'.format(
+        model._meta.app_label, model._meta.model_name, provider_id)
+
+
+def clear_region_components_cache(sender, provider_ids, **kwargs):
+    '''
+    Remove the cached region components of the given providers, ``sender``
+    is the intermediary model. Connected to ``region_components_changed``
+    and, if the cache is enabled, to the save and delete signals of every
+    intermediary model (see ``connect_region_components_cache``).
+    '''
+    cache = get_region_component_cache()
+    if cache is not None and provider_ids:
+        cache.delete_many([
+            region_components_cache_key(sender, provider_id)
+            for provider_id in provider_ids])
+
+
+def _region_component_changed(sender, instance, **kwargs):
+    clear_region_components_cache(sender, [instance.provider_id])
+
+
+def connect_region_components_cache(model):
+    '''
+    Clear the cached region components when a single row of the intermediary
+    model ``model`` is saved or deleted. The receivers are only connected if
+    ``MC_REGION_COMPONENT_CACHE`` is set, as delete receivers disable the
+    fast deletion of querysets.
+    '''
+    models.signals.post_save.connect(_region_component_changed, sender=model)
+    models.signals.post_delete.connect(_region_component_changed, sender=model)
+
+
+def disconnect_region_components_cache(model):
+    models.signals.post_save.disconnect(_region_component_changed, sender=model)
+    models.signals.post_delete.disconnect(_region_component_changed, sender=model)
+
+
+def delete_region_components(queryset):
+    '''
+    Delete the region components in ``queryset`` with a single query and
+    without sending signals for every row. Region components have no
+    dependent objects. Callers send ``region_components_changed`` instead.
+    '''
+    queryset._raw_delete(queryset.db)
+
+
+region_components_changed.connect(clear_region_components_cache)
 
 
 class RegionComponentBaseManager(models.Manager):
+    '''
+    Besides ``visible`` the manager provides bulk operations to reorder, move
+    and copy region components. They run in a single transaction, use a
+    constant number of queries and send one ``region_components_changed``
+    signal instead of one signal per row.
+    '''
+
+    # Maximum number of rows that are updated with one query by
+    # ``set_positions``.
+    update_batch_size = 250
+    # Distance between the positions that ``insert_position`` and
+    # ``rebalance`` leave, so most inserts don't need to move other rows.
+    position_gap = 1024
+
     def visible(self):
         '''
         This allows django_mc to provide a common place for injecting additional filters
         to the component<->page/layout relation. Only "visible" components will then be used.
-        As django_mc does not need any visible-filtering by default we just return self.all(),
-        you still may overwrite this to fit your needs.
+        By default a region component is visible between its (optional) ``visible_from``
+        and ``visible_until`` dates, you still may overwrite this to fit your needs.
         '''
-        return self.all()
+        now = timezone.now()
+        return self.filter(
+            models.Q(visible_from__isnull=True) | models.Q(visible_from__lte=now),
+            models.Q(visible_until__isnull=True) | models.Q(visible_until__gt=now))
+
+    def next_visibility_change(self):
+        '''
+        Return the next point in time at which one of the region components
+        becomes visible or invisible, or ``None`` if the visibility of all
+        region components is fixed. Uses one query.
+        '''
+        now = timezone.now()
+        changes = self.aggregate(
+            next_from=models.Min(models.Case(
+                models.When(visible_from__gt=now, then='visible_from'))),
+            next_until=models.Min(models.Case(
+                models.When(visible_until__gt=now, then='visible_until'))))
+        changes = [change for change in changes.values() if change is not None]
+        return min(changes) if changes else None
+
+    def _affected(self, pks):
+        provider_ids = set()
+        region_ids = set()
+        for provider_id, region_id in self.filter(pk__in=pks).values_list(
+                'provider_id', 'region_id'):
+            provider_ids.add(provider_id)
+            region_ids.add(region_id)
+        return provider_ids, region_ids
+
+    def _send_changed(self, provider_ids, region_ids):
+        if provider_ids:
+            region_components_changed.send(
+                sender=self.model,
+                provider_ids=provider_ids,
+                region_ids=region_ids)
+
+    def _update_positions(self, positions):
+        pks = sorted(positions)
+        for i in range(0, len(pks), self.update_batch_size):
+            batch = pks[i:i + self.update_batch_size]
+            self.filter(pk__in=batch).update(position=models.Case(
+                *[models.When(pk=pk, then=models.Value(positions[pk])) for pk in batch],
+                output_field=models.IntegerField()))
+
+    def set_positions(self, positions):
+        '''
+        Set the positions of many region components at once. ``positions`` is
+        a dict (or a list of pairs) that maps region components (or their
+        pks) to their new position.
+        '''
+        positions = dict((_pk(key), value) for key, value in dict(positions).items())
+        if not positions:
+            return
+        with transaction.atomic(using=self.db):
+            provider_ids, region_ids = self._affected(positions.keys())
+            self._update_positions(positions)
+        self._send_changed(provider_ids, region_ids)
+
+    def reorder(self, region_components, start=0, step=1):
+        '''
+        Number the given region components (or their pks) in the given order,
+        starting with ``start`` and increasing by ``step``.
+        '''
+        self.set_positions(
+            (region_component, start + index * step)
+            for index, region_component in enumerate(region_components))
+
+    def _siblings(self, provider, region, exclude=None):
+        rows = self.filter(provider=_pk(provider), region=_pk(region))
+        if exclude is not None:
+            rows = rows.exclude(pk=_pk(exclude))
+        return list(rows.order_by('position', 'pk').values_list('pk', 'position'))
+
+    def insert_position(self, provider, region, index=None, exclude=None, providers=None):
+        '''
+        Return the position for a region component that shall be inserted
+        at ``index`` into the region components of ``provider`` in
+        ``region`` (``None`` to append). ``exclude`` may be a region
+        component that is ignored, e.g. the one that is moved.
+
+        The position is chosen between the positions of the neighbours, so no
+        other row needs to be changed. Only if there is no free position left,
+        the nearest neighbours of the same provider are moved apart, within
+        the range that is free of the region components of the other
+        ``providers`` whose components are combined with the ones of
+        ``provider`` (by default ``provider.get_component_providers()`` if it
+        has this method, e.g. the parents of a layout). So the order across
+        the providers is kept.
+        '''
+        with transaction.atomic(using=self.db):
+            position, moved = self._insert_position(
+                provider, region, index, exclude, providers)
+        if moved:
+            self._send_changed(set([_pk(provider)]), set([_pk(region)]))
+        return position
+
+    def _insert_position(self, provider, region, index, exclude, providers):
+        # Returns the position and the new positions of the moved rows.
+        siblings = self._siblings(provider, region, exclude)
+        positions = [position for pk, position in siblings]
+        if index is None or index > len(positions):
+            index = len(positions)
+        index = max(index, 0)
+        if not positions:
+            return 0, {}
+        if index == 0:
+            return positions[0] - self.position_gap, {}
+        if index == len(positions):
+            return positions[-1] + self.position_gap, {}
+        lower, upper = positions[index - 1], positions[index]
+        if upper - lower > 1:
+            return (lower + upper) // 2, {}
+        fixed = self._other_positions(provider, region, providers)
+        position, moved = self._spread(siblings, index, fixed)
+        self._update_positions(moved)
+        return position, moved
+
+    def _other_positions(self, provider, region, providers):
+        '''
+        Return the positions of the region components of the given
+        ``providers`` in ``region``, except the ones of ``provider``.
+        '''
+        if providers is None:
+            if not isinstance(provider, models.Model):
+                provider_model = self.model._meta.get_field('provider').rel.to
+                provider = provider_model._default_manager.get(pk=provider)
+            get_component_providers = getattr(provider, 'get_component_providers', None)
+            providers = get_component_providers() if get_component_providers else []
+        positions = []
+        for other in providers:
+            if not isinstance(other, RegionComponentProvider):
+                continue
+            if other.region_components.model is self.model and other.pk == _pk(provider):
+                continue
+            positions.extend(other.region_components.filter(
+                region=_pk(region)).values_list('position', flat=True))
+        return sorted(positions)
+
+    def _spread(self, siblings, index, fixed=()):
+        '''
+        Find the smallest window of ``siblings`` next to ``index`` that can be
+        renumbered to make room for a row at ``index``. The window is only
+        renumbered within the range between its neighbours and the ``fixed``
+        positions, so it is not moved past them. Returns the position that is
+        left for the inserted row and a dict with the new positions of the
+        rows in the window.
+        '''
+        positions = [position for pk, position in siblings]
+        size = 1
+        while True:
+            for start, end in (
+                    (index - size, index + size), (index - size, index), (index, index + size)):
+                start, end = max(start, 0), min(end, len(positions))
+                window = positions[start:end]
+                if not window or any(window[0] <= f <= window[-1] for f in fixed):
+                    continue
+                count = end - start + 1
+                lower = [f for f in fixed if f < window[0]]
+                if start > 0:
+                    lower.append(positions[start - 1])
+                lower = max(lower) if lower else window[0] - self.position_gap * count
+                upper = [f for f in fixed if f > window[-1]]
+                if end < len(positions):
+                    upper.append(positions[end])
+                upper = min(upper) if upper else window[-1] + self.position_gap * count
+                if upper - lower > count:
+                    step = (upper - lower) // (count + 1)
+                    slots = [lower + step * (i + 1) for i in range(count)]
+                    new_position = slots.pop(index - start)
+                    return new_position, dict(
+                        (pk, position) for (pk, old_position), position
+                        in zip(siblings[start:end], slots))
+            if size >= len(positions):
+                break
+            size *= 2
+        # The other providers take the positions around the neighbours, so
+        # the order across the providers cannot be kept.
+        return self._spread(siblings, index)
+
+    def move_to(self, region_component, index, providers=None):
+        '''
+        Move ``region_component`` to ``index`` within the region components of
+        its provider and region. Usually only its own row is changed, see
+        ``insert_position``.
+        '''
+        with transaction.atomic(using=self.db):
+            position, moved = self._insert_position(
+                region_component.provider_id, region_component.region_id,
+                index, region_component, providers)
+            self.filter(pk=region_component.pk).update(position=position)
+        region_component.position = position
+        self._send_changed(
+            set([region_component.provider_id]), set([region_component.region_id]))
+
+    def rebalance(self, provider, region):
+        '''
+        Renumber the region components of ``provider`` in ``region`` with
+        ``position_gap`` between them, keeping their order. Run it
+        periodically for regions with many inserts.
+        '''
+        self.reorder(
+            [pk for pk, position in self._siblings(provider, region)],
+            step=self.position_gap)
+
+    def move(self, region_components, region, position=None):
+        '''
+        Move the given region components (or their pks) to ``region``. If
+        ``position`` is given they are numbered in the given order, starting
+        with ``position``.
+        '''
+        pks = [_pk(region_component) for region_component in region_components]
+        if not pks:
+            return
+        with transaction.atomic(using=self.db):
+            provider_ids, region_ids = self._affected(pks)
+            self.filter(pk__in=pks).update(region=_pk(region))
+            if position is not None:
+                self._update_positions(dict(
+                    (pk, index) for index, pk in enumerate(pks, position)))
+        region_ids.add(_pk(region))
+        self._send_changed(provider_ids, region_ids)
+
+    def copy_to_providers(self, source, providers, regions=None, replace=False):
+        '''
+        Copy the region components of the provider ``source`` to all given
+        ``providers`` (or their pks), limited to ``regions`` if given. With
+        ``replace`` the existing region components of the providers (in
+        ``regions``) are deleted first. The region components a flattened
+        layout inherited from its parents are not copied. Returns the number
+        of created region components.
+        '''
+        provider_ids = set(_pk(provider) for provider in providers)
+        provider_ids.discard(_pk(source))
+        if not provider_ids:
+            return 0
+        fields = [
+            field.attname for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.name != 'provider']
+        rows = self.filter(provider=_pk(source))
+        if 'inherited' in fields:
+            # The components a flattened layout copied from its parents.
+            rows = rows.filter(inherited=False)
+        if regions is not None:
+            rows = rows.filter(region__in=[_pk(region) for region in regions])
+        rows = list(rows.order_by('pk').values(*fields))
+        region_ids = set(row['region_id'] for row in rows)
+
+        with transaction.atomic(using=self.db):
+            if replace:
+                existing = self.filter(provider__in=provider_ids)
+                if regions is not None:
+                    region_ids.update(_pk(region) for region in regions)
+                    existing = existing.filter(region__in=[_pk(region) for region in regions])
+                else:
+                    # The providers may have region components in regions
+                    # the source has none in.
+                    region_ids.update(existing.order_by().values_list(
+                        'region_id', flat=True).distinct())
+                delete_region_components(existing)
+            region_components = [
+                self.model(provider_id=provider_id, **row)
+                for provider_id in sorted(provider_ids)
+                for row in rows]
+            self.bulk_create(region_components)
+
+        self._send_changed(provider_ids, region_ids)
+        return len(region_components)
 
 
 class RegionComponentProvider(models.Model):
@@ -135,19 +600,45 @@ class RegionComponentProvider(models.Model):
             {
                 region.pk: [region_component_obj, region_component_obj, ...]
             }
-        '''
 
-        # see RegionComponentBaseManager for details on visible()
-        queryset = self.region_components.visible()
+        If ``MC_REGION_COMPONENT_CACHE`` is set, the result is cached until
+        the visibility of one of the region components changes next.
+        '''
+        cache = get_region_component_cache()
+        if cache is not None:
+            key = region_components_cache_key(self.RegionComponent, self.pk)
+            regions = cache.get(key)
+            if regions is not None:
+                return regions
+
+        queryset = self.get_visible_region_components()
         regions = {}
         for region_component in queryset:
             regions.setdefault(region_component.region_id, []).append(region_component)
+
+        if cache is not None:
+            timeout = MC_REGION_COMPONENT_CACHE_TIMEOUT
+            next_change = self.region_components.next_visibility_change()
+            if next_change is not None:
+                seconds = (next_change - timezone.now()).total_seconds()
+                timeout = max(1, min(timeout, int(ceil(seconds))))
+            cache.set(key, regions, timeout)
         return regions
 
+    def get_visible_region_components(self):
+        '''
+        Return the queryset of the region components that are shown right
+        now, see ``RegionComponentBaseManager.visible``.
+        '''
+        return self.region_components.visible()
+
     class RegionComponentBase(models.Model):
         region = models.ForeignKey('django_mc.Region', related_name='+')
         component = models.ForeignKey(MC_COMPONENT_BASE_MODEL, related_name='+')
         position = models.IntegerField(default=0)
+        # Optional visibility window, see ``RegionComponentBaseManager.visible``.
+        visible_from = models.DateTimeField(null=True, blank=True, db_index=True)
+        visible_until = models.DateTimeField(null=True, blank=True, db_index=True)
 
         # The field ``provider`` will be dynamically defined in the created
         # intermediary table.
@@ -178,6 +669,8 @@ class RegionComponentProvider(models.Model):
                     related_name='region_components')
                 component = models.ForeignKey(ComponentBase, related_name='+')
                 position = models.IntegerField(default=0)
+                visible_from = models.DateTimeField(null=True, blank=True)
+                visible_until = models.DateTimeField(null=True, blank=True)
 
         Note that the intermediary model inherits from the
         ``RegionComponentBase`` attribute on the ``ComponentProvider``. You can use
@@ -238,15 +731,133 @@ class RegionComponentProvider(models.Model):
 
         sender.RegionComponent = model
 
+        if MC_REGION_COMPONENT_CACHE is not None:
+            connect_region_components_cache(model)
+
 
 models.signals.class_prepared.connect(
     RegionComponentProvider._create_region_component_model)
 
 
+def clear_available_components_cache(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        Region.objects.clear_available_components_cache()
+
+
+models.signals.m2m_changed.connect(
+    clear_available_components_cache,
+    sender=Region.available_components.through)
+
+
+def region_component_rows(providers):
+    '''
+    Fetch the region components of all given providers with one single
+    ``UNION ALL`` query over their intermediary tables. Yields tuples in the
+    form of::
+
+        (region_id, position, provider_depth, region_component_pk)
+
+    ordered by region, position and depth, where ``provider_depth`` is the
+    index of the row's provider in ``providers``. Providers that are no
+    ``RegionComponentProvider`` instances are skipped, but still count for the
+    depth.
+    '''
+    parts = []
+    params = []
+    using = None
+    for depth, provider in enumerate(providers):
+        if not isinstance(provider, RegionComponentProvider):
+            continue
+        queryset = provider.get_visible_region_components().order_by().values_list(
+            'region_id', 'position', 'pk')
+        if using is None:
+            using = queryset.db
+        sql, sql_params = queryset.query.get_compiler(using=using).as_sql()
+        parts.append('SELECT U{0}.*, {1:d} FROM ({2}) U{0}'.format(
+            len(parts), depth, sql))
+        params.extend(sql_params)
+    if not parts:
+        return
+    sql = '{0} ORDER BY 1, 2, 4, 3'.format(' UNION ALL '.join(parts))
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        for region_id, position, pk, depth in cursor:
+            yield region_id, position, depth, pk
+
+
+def prefetch_components(region_components):
+    '''
+    Load the real component instances of the given region components with one
+    query per component type and attach them to the region components. This
+    way ``resolve_component`` does not need two queries for every single
+    component (one for the component relation, one for
+    ``get_real_instance``).
+
+    The components are loaded with the ``_base_manager`` like the foreign key
+    does, so a filtering default manager doesn't hide them. Objects that are
+    no region components are ignored. Returns the set of loaded component
+    models.
+    '''
+    pending_by_model = {}
+    for region_component in region_components:
+        component_id = getattr(region_component, 'component_id', None)
+        if component_id is None:
+            continue
+        field = region_component._meta.get_field('component')
+        if hasattr(region_component, field.get_cache_name()):
+            continue
+        pending = pending_by_model.setdefault(field.rel.to, {})
+        pending.setdefault(component_id, []).append(
+            (region_component, field.get_cache_name()))
+
+    component_models = set()
+    for base_model, pending in pending_by_model.iteritems():
+        pks_by_content_type = {}
+        queryset = base_model._base_manager.filter(pk__in=pending.keys())
+        for pk, content_type_id in queryset.values_list('pk', '_poly_ct_id'):
+            pks_by_content_type.setdefault(content_type_id, []).append(pk)
+        for content_type_id, pks in pks_by_content_type.iteritems():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            component_models.add(model)
+            for component in model._base_manager.filter(pk__in=pks):
+                for region_component, cache_name in pending[component.pk]:
+                    setattr(region_component, cache_name, component)
+    return component_models
+
+
 class LayoutManager(models.Manager):
     def get_by_natural_key(self, slug):
         return self.get(slug=slug)
 
+    def sync_flattened(self, layouts=None):
+        '''
+        Flatten all flattened layouts again, so they pick up the changes of
+        their parent layouts. If ``layouts`` is given, only the flattened
+        layouts among them and their descendants are synced. Parents are
+        synced before their children. Returns the synced layouts.
+        '''
+        parent_ids = dict(self.values_list('pk', 'parent_id'))
+
+        def ancestors(pk):
+            seen = []
+            while pk is not None and pk not in seen:
+                seen.append(pk)
+                pk = parent_ids.get(pk)
+            return seen
+
+        flattened = self.filter(flattened=True)
+        if layouts is not None:
+            layout_ids = set(_pk(layout) for layout in layouts)
+            flattened = [
+                layout for layout in flattened
+                if layout_ids.intersection(ancestors(layout.pk))]
+        flattened = sorted(flattened, key=lambda layout: len(ancestors(layout.pk)))
+        for layout in flattened:
+            layout.flatten()
+        return flattened
+
 
 class LayoutMixin(TemplateHintProvider, RegionComponentProvider, models.Model):
     DEFAULT_LAYOUT_SLUG = 'default'
@@ -257,6 +868,11 @@ class LayoutMixin(TemplateHintProvider, RegionComponentProvider, models.Model):
         help_text=_(
             'Select a layout which shall be extended by this layout according to region '
             'extend rules.'))
+    flattened = models.BooleanField(
+        default=False, editable=False,
+        help_text=_(
+            'Flattened layouts store the components of their parent layouts '
+            'themselves.'))
 
     objects = LayoutManager()
 
@@ -265,6 +881,14 @@ class LayoutMixin(TemplateHintProvider, RegionComponentProvider, models.Model):
         verbose_name = _('Layout')
         verbose_name_plural = _('Layouts')
 
+    class RegionComponentBase(RegionComponentProvider.RegionComponentBase):
+        # Marks the region components that ``flatten`` copied from the parent
+        # layouts.
+        inherited = models.BooleanField(default=False, editable=False)
+
+        class Meta:
+            abstract = True
+
     def __unicode__(self):
         return self.name
 
@@ -279,11 +903,118 @@ class LayoutMixin(TemplateHintProvider, RegionComponentProvider, models.Model):
         return ['layout-{0}'.format(self.slug)] + parent_hints
 
     def get_component_providers(self):
-        if self.parent_id:
+        if self.parent_id and not self.flattened:
             return self.parent.get_component_providers() + [self]
         else:
             return [self]
 
+    def get_visible_region_components(self):
+        '''
+        Like ``RegionComponentProvider.get_visible_region_components``, but
+        the inherited region components of a flattened layout in a region with
+        the ``OVERWRITE`` rule are only shown if none of the layout's own
+        region components in that region is visible.
+        '''
+        return self._exclude_overwritten(
+            super(LayoutMixin, self).get_visible_region_components())
+
+    def _exclude_overwritten(self, queryset):
+        '''
+        Exclude the inherited region components of a flattened layout from
+        ``queryset`` in the ``OVERWRITE`` regions that contain one of its own
+        region components in ``queryset``.
+        '''
+        if not self.flattened:
+            return queryset
+        overwrite_region_ids = [
+            region_id for region_id, region in Region.objects.regions_by_pk().items()
+            if region.component_extend_rule == Region.OVERWRITE]
+        if not overwrite_region_ids:
+            return queryset
+        overwritten = queryset.filter(
+            inherited=False, region__in=overwrite_region_ids).values('region_id')
+        return queryset.exclude(inherited=True, region__in=overwritten)
+
+    def _check_inherited_field(self):
+        try:
+            self.RegionComponent._meta.get_field('inherited')
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                '{0} has no "inherited" field. The RegionComponentBase of a '
+                'layout model must extend LayoutMixin.RegionComponentBase to '
+                'flatten layouts.'.format(self.RegionComponent.__name__))
+
+    def flatten(self):
+        '''
+        Copy the effective region components of the parent layouts (after
+        applying the region extend rules) into this layout, so the parent
+        chain doesn't need to be resolved at runtime anymore. The copies are
+        marked as ``inherited`` and are replaced when the layout is flattened
+        again, e.g. by ``LayoutManager.sync_flattened`` after the parents
+        changed.
+
+        The copies are made for all regions, even if the layout overwrites
+        them. The ``OVERWRITE`` rule between the layout and its parents is
+        applied at runtime after the visibility filter (see
+        ``get_visible_region_components``), so the parents are still shown
+        while none of the layout's own region components is visible. Between
+        the parent layouts the rules are applied when flattening, regardless
+        of the visibility windows.
+        '''
+        self._check_inherited_field()
+        RegionComponent = self.RegionComponent
+        regions_by_id = Region.objects.regions_by_pk()
+        inherited = {}
+        if self.parent_id:
+            for provider in self.parent.get_component_providers():
+                provided = {}
+                # A flattened parent stores the components of its own parents
+                # too, which its own components overwrite.
+                region_components = provider._exclude_overwritten(provider.region_components.all())
+                for region_component in region_components:
+                    provided.setdefault(region_component.region_id, []).append(region_component)
+                for region_id, region_components in provided.iteritems():
+                    inherited[region_id] = regions_by_id[region_id].extend_components(
+                        inherited.get(region_id, []), region_components)
+
+        fields = [
+            field.attname for field in RegionComponent._meta.concrete_fields
+            if not field.primary_key and field.name not in ('provider', 'inherited')]
+        with transaction.atomic():
+            delete_region_components(self.region_components.filter(inherited=True))
+            own_region_ids = set(self.region_components.values_list('region_id', flat=True))
+            copies = []
+            for region_id, region_components in inherited.iteritems():
+                for region_component in region_components:
+                    values = dict(
+                        (name, getattr(region_component, name)) for name in fields)
+                    copies.append(RegionComponent(provider=self, inherited=True, **values))
+            RegionComponent._default_manager.bulk_create(copies)
+            if not self.flattened:
+                self.flattened = True
+                type(self)._default_manager.filter(pk=self.pk).update(flattened=True)
+        region_components_changed.send(
+            sender=RegionComponent,
+            provider_ids=set([self.pk]),
+            region_ids=set(inherited) | own_region_ids)
+
+    def unflatten(self):
+        '''
+        Remove the region components that were copied by ``flatten`` and
+        resolve the parent layouts at runtime again.
+        '''
+        self._check_inherited_field()
+        with transaction.atomic():
+            region_ids = set(self.region_components.filter(
+                inherited=True).values_list('region_id', flat=True))
+            delete_region_components(self.region_components.filter(inherited=True))
+            self.flattened = False
+            type(self)._default_manager.filter(pk=self.pk).update(flattened=False)
+        region_components_changed.send(
+            sender=self.RegionComponent,
+            provider_ids=set([self.pk]),
+            region_ids=region_ids)
+
 #     @classmethod
 #     def _create_default_layout(cls, sender, **kwargs):
 #         # Only create default layout when the synced app is the django_mc.
@@ -0,0 +1,142 @@
+'''
+Query budgets for views using the ``LayoutMixin``.
+
+The number of queries a layout view needs only depends on the number of
+component providers and on the number of distinct component types on the
+page, not on the number of components. ``LayoutMixin`` computes that budget
+(see ``LayoutMixin.get_query_budget``) and ``QueryBudgetMiddleware`` or the
+``query_budget`` view decorator check it for every request. If the budget is
+exceeded, e.g. because a component queries the database for every instance
+again, ``QueryBudgetExceeded`` is raised in ``DEBUG`` mode and a warning is
+logged otherwise. Without ``DEBUG`` the budget is only checked if
+``MC_QUERY_BUDGET_CHECK`` is set, as every query has to be captured.
+
+In tests you can use ``assert_max_queries``::
+
+    with assert_max_queries(lambda: view.get_query_budget(providers, types)):
+        view.get_components_for_regions()
+'''
+import logging
+import re
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils.decorators import decorator_from_middleware
+from .settings import MC_QUERY_BUDGET_CHECK
+from .settings import MC_REGION_COMPONENT_CACHE
+
+
+logger = logging.getLogger('django_mc.query_budget')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def layout_query_budget(providers, component_types, extra=0):
+    '''
+    Return the number of queries a layout view may use for ``providers``
+    component providers and ``component_types`` distinct component types.
+
+    Every provider may cost one query to fetch its region components and one
+    to be resolved as parent of a layout. If the region components are cached
+    (``MC_REGION_COMPONENT_CACHE``), a cache miss costs one more query per
+    provider for the next visibility change. Resolving the components costs one
+    query plus one per component type, every component type may use one more
+    query in ``Renderable.prepare_batch``. One query each is left for the
+    view's object, the layout and the region cache.
+    '''
+    per_provider = 2 if MC_REGION_COMPONENT_CACHE is None else 3
+    return per_provider * providers + 2 * component_types + 4 + extra
+
+
+def _repeated_queries(queries, limit=3):
+    counts = {}
+    for query in queries:
+        sql = re.sub(r'\b\d+\b', '?', query['sql'])
+        counts[sql] = counts.get(sql, 0) + 1
+    repeated = sorted(
+        ((count, sql) for sql, count in counts.items() if count > 1),
+        reverse=True)
+    return repeated[:limit]
+
+
+def check_queries(queries, budget):
+    '''
+    Raise ``QueryBudgetExceeded`` if there are more ``queries`` (as captured
+    by Django) than ``budget``. The message lists the most repeated queries,
+    which usually point to the N+1 problem.
+    '''
+    if len(queries) <= budget:
+        return
+    message = ['{0} queries executed, the budget is {1}.'.format(
+        len(queries), budget)]
+    for count, sql in _repeated_queries(queries):
+        message.append('{0}x {1}'.format(count, sql))
+    raise QueryBudgetExceeded('\n'.join(message))
+
+
+@contextmanager
+def assert_max_queries(budget, using=DEFAULT_DB_ALIAS):
+    '''
+    Fail if the wrapped block executes more than ``budget`` queries. ``budget``
+    may be a callable, it is called after the block was executed.
+    '''
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if callable(budget):
+        budget = budget()
+    check_queries(context.captured_queries, budget)
+
+
+class QueryBudgetMiddleware(object):
+    '''
+    Checks the query budget of every request that is handled by a
+    ``LayoutMixin`` view if ``DEBUG`` or ``MC_QUERY_BUDGET_CHECK`` is on.
+    Requests to other views are not checked. If the middleware and the
+    ``query_budget`` decorator are both used, only the outer one checks the
+    request.
+    '''
+
+    def process_request(self, request):
+        if not (settings.DEBUG or MC_QUERY_BUDGET_CHECK):
+            return
+        if getattr(request, '_mc_captured_queries', None) is not None:
+            return  # already captured by an outer middleware or decorator
+        captured = CaptureQueriesContext(connections[DEFAULT_DB_ALIAS])
+        captured.__enter__()
+        request._mc_captured_queries = (self, captured)
+
+    def process_exception(self, request, exception):
+        self.stop_capture(request)
+
+    def process_response(self, request, response):
+        captured = self.stop_capture(request)
+        if captured is None:
+            return response
+        budget = getattr(request, '_mc_query_budget', None)
+        if budget is None:
+            return response
+        try:
+            check_queries(captured.captured_queries, budget)
+        except QueryBudgetExceeded as e:
+            if settings.DEBUG:
+                raise
+            logger.warning('%s: %s', request.path, e)
+        return response
+
+    def stop_capture(self, request):
+        '''
+        Stop the capture this middleware started for ``request`` and return
+        it, or ``None`` if it was not started by this middleware.
+        '''
+        owner, captured = getattr(request, '_mc_captured_queries', None) or (None, None)
+        if owner is not self:
+            return None
+        captured.__exit__(None, None, None)
+        request._mc_captured_queries = None
+        return captured
+
+
+query_budget = decorator_from_middleware(QueryBudgetMiddleware)
@@ -0,0 +1,402 @@
+'''
+Export and import of the regions, the layouts and the region components of
+the layouts as JSON Lines, used by the ``export_layouts`` and
+``import_layouts`` management commands.
+
+Every line is a JSON object with a ``type``::
+
+    {"type": "region", "slug": "main", "name": "Main", ..., "available_components": [["app", "teaser"]]}
+    {"type": "layout", "slug": "home", "name": "Home", "parent": "default"}
+    {"type": "region_component", "layout": "home", "region": "main", "component": 12,
+     "component_type": ["app", "teaser"], "position": 1}
+
+Regions and layouts are referenced by their slugs, component types by their
+app label and model name. Components are referenced by their primary key,
+they need to be synced separately (e.g. with ``dumpdata`` and ``loaddata``).
+As primary keys may differ between environments, the type of the component
+is exported too and the import fails if the component with that primary key
+has another type.
+
+The import looks up the natural keys once per model instead of once per row
+and creates the rows with ``bulk_create``. Regions and layouts are created or
+updated, the region components of all imported layouts are replaced. Region
+components that refer to missing components are skipped.
+'''
+import json
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from .models import Region, delete_region_components
+from .settings import MC_LAYOUT_MODEL
+from .signals import region_components_changed
+
+
+REGION_FIELDS = ('name', 'component_extend_rule', 'position', 'deferred')
+LAYOUT_FIELDS = ('name', 'flattened')
+
+
+class LayoutImportError(ValueError):
+    pass
+
+
+def get_layout_model():
+    return apps.get_model(*MC_LAYOUT_MODEL.split('.'))
+
+
+def get_available_components_table():
+    '''
+    Return the through model of ``Region.available_components`` and the names
+    of its region and content type columns.
+    '''
+    field = Region._meta.get_field('available_components')
+    through = field.rel.through
+    return (
+        through,
+        through._meta.get_field(field.m2m_field_name()).attname,
+        through._meta.get_field(field.m2m_reverse_field_name()).attname)
+
+
+def get_region_component_fields(model):
+    '''
+    Return the fields of the intermediary model ``model`` that are exported
+    as they are (like ``position``).
+    '''
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in ('provider', 'region', 'component')]
+
+
+def get_content_types():
+    '''
+    Return a dict that maps the content type ids to ``[app_label, model]``.
+    '''
+    return dict(
+        (pk, [app_label, model])
+        for pk, app_label, model in ContentType.objects.values_list(
+            'pk', 'app_label', 'model'))
+
+
+def iter_layout_records():
+    '''
+    Yield the records of all regions, layouts and layout region components.
+    Layouts are yielded after their parents.
+    '''
+    Layout = get_layout_model()
+
+    content_types = get_content_types()
+    through, region_column, content_type_column = get_available_components_table()
+    available_components = {}
+    for region_id, content_type_id in through._default_manager.order_by('pk').values_list(
+            region_column, content_type_column):
+        available_components.setdefault(region_id, []).append(
+            content_types[content_type_id])
+
+    region_slugs = {}
+    for region in Region.objects.order_by('position', 'slug'):
+        region_slugs[region.pk] = region.slug
+        record = {'type': 'region', 'slug': region.slug}
+        for name in REGION_FIELDS:
+            record[name] = getattr(region, name)
+        record['available_components'] = available_components.get(region.pk, [])
+        yield record
+
+    layouts = list(Layout.objects.order_by('pk').values(
+        'pk', 'slug', 'parent_id', *LAYOUT_FIELDS))
+    layout_slugs = dict((layout['pk'], layout['slug']) for layout in layouts)
+    parent_ids = dict((layout['pk'], layout['parent_id']) for layout in layouts)
+
+    def depth(pk):
+        level = 0
+        while parent_ids.get(pk) is not None and level <= len(parent_ids):
+            pk = parent_ids[pk]
+            level += 1
+        return level
+
+    for layout in sorted(layouts, key=lambda layout: depth(layout['pk'])):
+        record = {
+            'type': 'layout',
+            'slug': layout['slug'],
+            'parent': layout_slugs.get(layout['parent_id']),
+        }
+        for name in LAYOUT_FIELDS:
+            record[name] = layout[name]
+        yield record
+
+    fields = [field.attname for field in get_region_component_fields(Layout.RegionComponent)]
+    rows = Layout.RegionComponent._default_manager.order_by(
+        'provider_id', 'region_id', 'position', 'pk').values(
+        'provider_id', 'region_id', 'component_id', 'component___poly_ct_id', *fields)
+    for row in rows.iterator():
+        record = {
+            'type': 'region_component',
+            'layout': layout_slugs[row['provider_id']],
+            'region': region_slugs[row['region_id']],
+            'component': row['component_id'],
+            'component_type': content_types[row['component___poly_ct_id']],
+        }
+        for name in fields:
+            record[name] = row[name]
+        yield record
+
+
+def export_layouts(output):
+    '''
+    Write all regions, layouts and layout region components to the file like
+    object ``output``, one JSON object per line.
+    '''
+    for record in iter_layout_records():
+        output.write(json.dumps(record, sort_keys=True, cls=DjangoJSONEncoder) + '\n')
+
+
+class LayoutImporter(object):
+    '''
+    Imports the records written by ``export_layouts``. The lines are
+    processed as a stream, region components are created in batches of
+    ``batch_size``.
+    '''
+
+    batch_size = 1000
+
+    def __init__(self, batch_size=None):
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self.Layout = get_layout_model()
+        self.RegionComponent = self.Layout.RegionComponent
+        self.regions = []
+        self.layouts = []
+        self.region_components = []
+        self.imported_layout_slugs = set()
+        self.cleared_layout_ids = set()
+        self._region_ids = None
+        self._layout_ids = None
+        self._component_types = None
+        self._content_type_ids = None
+        self.counts = {
+            'region': 0,
+            'layout': 0,
+            'region_component': 0,
+            'skipped': 0,
+        }
+
+    def load(self, lines):
+        '''
+        Import the given lines in one transaction. Returns a dict with the
+        number of imported records by type and the number of skipped region
+        components.
+        '''
+        with transaction.atomic():
+            for line_number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    record_type = record['type']
+                except (ValueError, TypeError, KeyError):
+                    raise LayoutImportError(
+                        'Line {0}: invalid record.'.format(line_number))
+                if record_type == 'region':
+                    self.regions.append(record)
+                elif record_type == 'layout':
+                    self.layouts.append(record)
+                elif record_type == 'region_component':
+                    self.region_components.append(record)
+                    if len(self.region_components) >= self.batch_size:
+                        self.flush_region_components()
+                else:
+                    raise LayoutImportError('Line {0}: unknown type "{1}".'.format(
+                        line_number, record_type))
+            self.flush_region_components()
+            self.clear_region_components(self.imported_layout_slugs)
+        Region.objects.clear_cache()
+        region_components_changed.send(
+            sender=self.RegionComponent,
+            provider_ids=self.cleared_layout_ids,
+            region_ids=set(self.get_region_ids().values()))
+        return self.counts
+
+    def get_region_ids(self):
+        if self._region_ids is None:
+            self._region_ids = dict(Region.objects.values_list('slug', 'pk'))
+        return self._region_ids
+
+    def get_layout_ids(self):
+        if self._layout_ids is None:
+            self._layout_ids = dict(self.Layout.objects.values_list('slug', 'pk'))
+        return self._layout_ids
+
+    def get_component_types(self):
+        '''
+        Return a dict that maps the pks of all components to the ids of their
+        content types.
+        '''
+        if self._component_types is None:
+            component_model = self.RegionComponent._meta.get_field('component').rel.to
+            self._component_types = dict(
+                component_model._base_manager.values_list('pk', '_poly_ct_id'))
+        return self._component_types
+
+    def get_content_type_ids(self):
+        if self._content_type_ids is None:
+            self._content_type_ids = dict(
+                (tuple(natural_key), pk) for pk, natural_key in get_content_types().items())
+        return self._content_type_ids
+
+    def flush_regions(self):
+        if not self.regions:
+            return
+        records, self.regions = self.regions, []
+        existing = dict(
+            (region.slug, region) for region in Region.objects.filter(
+                slug__in=[record['slug'] for record in records]))
+        new_regions = []
+        for record in records:
+            values = dict(
+                (name, record[name]) for name in REGION_FIELDS if name in record)
+            region = existing.get(record['slug'])
+            if region is None:
+                new_regions.append(Region(slug=record['slug'], **values))
+            elif any(getattr(region, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(region, name, value)
+                region.save(update_fields=values.keys())
+        Region.objects.bulk_create(new_regions)
+        self._region_ids = None
+        self.counts['region'] += len(records)
+        self.set_available_components(records)
+
+    def set_available_components(self, records):
+        content_type_ids = self.get_content_type_ids()
+        region_ids = self.get_region_ids()
+        wanted = set()
+        for record in records:
+            for app_label, model in record.get('available_components', ()):
+                try:
+                    content_type_id = content_type_ids[app_label, model]
+                except KeyError:
+                    raise LayoutImportError('Unknown component type "{0}.{1}".'.format(
+                        app_label, model))
+                wanted.add((region_ids[record['slug']], content_type_id))
+
+        through, region_column, content_type_column = get_available_components_table()
+        rows = through._default_manager.filter(**{
+            region_column + '__in': [region_ids[record['slug']] for record in records]})
+        existing = {}
+        for pk, region_id, content_type_id in rows.values_list(
+                'pk', region_column, content_type_column):
+            existing[region_id, content_type_id] = pk
+        removed = [pk for key, pk in existing.items() if key not in wanted]
+        if removed:
+            through._default_manager.filter(pk__in=removed).delete()
+        through._default_manager.bulk_create([
+            through(**{region_column: region_id, content_type_column: content_type_id})
+            for region_id, content_type_id in wanted
+            if (region_id, content_type_id) not in existing
+        ])
+
+    def flush_layouts(self):
+        if not self.layouts:
+            return
+        records, self.layouts = self.layouts, []
+        existing = dict(
+            (layout['slug'], layout)
+            for layout in self.Layout.objects.values('slug', 'pk', 'parent_id', *LAYOUT_FIELDS))
+        layout_ids = dict((slug, layout['pk']) for slug, layout in existing.items())
+
+        # Create the layouts level by level, so the parents exist when their
+        # children are created.
+        pending = records
+        while pending:
+            ready = [
+                record for record in pending
+                if not record.get('parent') or record['parent'] in layout_ids]
+            if not ready:
+                raise LayoutImportError('Unknown parent layout "{0}".'.format(
+                    pending[0]['parent']))
+            new_layouts = []
+            for record in ready:
+                values = dict(
+                    (name, record[name]) for name in LAYOUT_FIELDS if name in record)
+                values['parent_id'] = (
+                    layout_ids[record['parent']] if record.get('parent') else None)
+                if record['slug'] in existing:
+                    layout = existing[record['slug']]
+                    if any(layout[name] != value for name, value in values.items()):
+                        self.Layout.objects.filter(pk=layout['pk']).update(**values)
+                else:
+                    new_layouts.append(self.Layout(slug=record['slug'], **values))
+            self.Layout.objects.bulk_create(new_layouts)
+            if new_layouts:
+                layout_ids.update(self.Layout.objects.filter(
+                    slug__in=[layout.slug for layout in new_layouts]).values_list('slug', 'pk'))
+            ready_slugs = set(record['slug'] for record in ready)
+            pending = [record for record in pending if record['slug'] not in ready_slugs]
+
+        self._layout_ids = layout_ids
+        self.imported_layout_slugs.update(record['slug'] for record in records)
+        self.counts['layout'] += len(records)
+
+    def clear_region_components(self, layout_slugs):
+        '''
+        Delete the existing region components of the given layouts, once per
+        import.
+        '''
+        layout_ids = self.get_layout_ids()
+        try:
+            pks = set(layout_ids[slug] for slug in layout_slugs)
+        except KeyError as e:
+            raise LayoutImportError('Unknown layout "{0}".'.format(e.args[0]))
+        pks -= self.cleared_layout_ids
+        if pks:
+            delete_region_components(
+                self.RegionComponent._default_manager.filter(provider__in=pks))
+            self.cleared_layout_ids.update(pks)
+
+    def flush_region_components(self):
+        self.flush_regions()
+        self.flush_layouts()
+        if not self.region_components:
+            return
+        records, self.region_components = self.region_components, []
+        self.clear_region_components(
+            self.imported_layout_slugs | set(record['layout'] for record in records))
+
+        layout_ids = self.get_layout_ids()
+        region_ids = self.get_region_ids()
+        component_types = self.get_component_types()
+        content_type_ids = self.get_content_type_ids()
+        fields = get_region_component_fields(self.RegionComponent)
+        region_components = []
+        for record in records:
+            if record['component'] not in component_types:
+                self.counts['skipped'] += 1
+                continue
+            if 'component_type' in record:
+                component_type = tuple(record['component_type'])
+                if content_type_ids.get(component_type) != component_types[record['component']]:
+                    raise LayoutImportError(
+                        'Component {0} is no "{1}", the components differ from the '
+                        'exported ones.'.format(record['component'], '.'.join(component_type)))
+            try:
+                region_id = region_ids[record['region']]
+            except KeyError:
+                raise LayoutImportError('Unknown region "{0}".'.format(record['region']))
+            values = dict(
+                (field.attname, field.to_python(record[field.attname]))
+                for field in fields if field.attname in record)
+            region_components.append(self.RegionComponent(
+                provider_id=layout_ids[record['layout']],
+                region_id=region_id,
+                component_id=record['component'],
+                **values))
+        self.RegionComponent._default_manager.bulk_create(region_components)
+        self.counts['region_component'] += len(region_components)
+
+
+def import_layouts(lines, batch_size=None):
+    '''
+    Import the regions, layouts and layout region components from the JSON
+    Lines in ``lines`` (e.g. an open file), see ``LayoutImporter``.
+    '''
+    return LayoutImporter(batch_size=batch_size).load(lines)
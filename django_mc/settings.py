@@ -3,3 +3,34 @@ from django.conf import settings
 
 MC_LAYOUT_MODEL = getattr(settings, 'MC_LAYOUT_MODEL', 'django_mc.layout')
 MC_COMPONENT_BASE_MODEL = getattr(settings, 'MC_COMPONENT_BASE_MODEL', 'django_mc.componentbase')
+
+# Where the ``InstrumentationMiddleware`` reports the collected timings to,
+# either ``'header'`` (``Server-Timing``) or ``'log'``.
+MC_INSTRUMENTATION_OUTPUT = getattr(settings, 'MC_INSTRUMENTATION_OUTPUT', 'header')
+
+# Prune template names that don't exist with an index of the template
+# directories before asking the template loaders (see
+# ``django_mc.template_index``).
+MC_TEMPLATE_INDEX = getattr(settings, 'MC_TEMPLATE_INDEX', False)
+
+# Maximum number of hinted template names ``{% render_component %}`` tries
+# before the fallback template, ``None`` for no limit.
+MC_MAX_TEMPLATE_HINTS = getattr(settings, 'MC_MAX_TEMPLATE_HINTS', None)
+
+# How ``LayoutMixin`` renders the placeholder of a deferred region, either
+# ``'esi'`` (an ``<esi:include>`` tag) or ``'fragment'`` (an empty ``<div>``
+# with the fragment URL to be fetched by JavaScript).
+MC_DEFERRED_REGION_OUTPUT = getattr(settings, 'MC_DEFERRED_REGION_OUTPUT', 'esi')
+
+# Cache alias used to cache the region components of every component
+# provider, ``None`` disables the cache. An entry expires when the next
+# region component of the provider becomes visible or invisible (see
+# ``visible_from`` and ``visible_until``), but after
+# ``MC_REGION_COMPONENT_CACHE_TIMEOUT`` seconds at the latest.
+MC_REGION_COMPONENT_CACHE = getattr(settings, 'MC_REGION_COMPONENT_CACHE', None)
+MC_REGION_COMPONENT_CACHE_TIMEOUT = getattr(settings, 'MC_REGION_COMPONENT_CACHE_TIMEOUT', 3600)
+
+# Check the query budgets of the layout views (see
+# ``django_mc.query_budget``) even if ``DEBUG`` is off. The queries of every
+# request are captured to count them, which costs time and memory.
+MC_QUERY_BUDGET_CHECK = getattr(settings, 'MC_QUERY_BUDGET_CHECK', False)
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# Sent once by the bulk operations of ``RegionComponentBaseManager`` (instead
+# of one signal per row), with the intermediary model as sender. The
+# ``provider_ids`` and ``region_ids`` arguments are the sets of the providers
+# and regions whose region components were changed.
+region_components_changed = Signal(providing_args=['provider_ids', 'region_ids'])
@@ -0,0 +1,84 @@
+'''
+Streaming of pages rendered by a ``LayoutMixin`` view.
+
+Django templates are rendered into a single string, so a page can not be sent
+to the client while it is rendered. Instead the parts of the page template that
+render regions are wrapped in ``{% stream_region %}`` tags::
+
+    {% load django_mc_stream_tags %}
+    <html>
+    <head>...</head>
+    <body>
+        {% stream_region %}
+            {% for component in region.main %}
+                {% render_component component for region.main layout %}
+            {% endfor %}
+        {% endstream_region %}
+        {% stream_region %}
+            {% for component in region.sidebar %}
+                {% render_component component for region.sidebar layout %}
+            {% endfor %}
+        {% endstream_region %}
+    </body>
+    </html>
+
+When the view has ``streaming`` enabled, the template is rendered without the
+content of those tags first. The result is split at the ``stream_region``
+tags and sent as chunks, the content of every ``stream_region`` tag is
+rendered right before it is sent. The regions are accessed (and their
+components resolved) only then, so the head of the page is sent before the
+first component is even loaded.
+
+Without ``streaming`` the ``stream_region`` tags render their content in
+place, so the same templates can be used by both kinds of views.
+
+Don't use ``stream_region`` inside of tags that store their output, like
+``{% cache %}``.
+'''
+import re
+import uuid
+from copy import copy
+
+
+class PageStream(object):
+    '''
+    Collects the deferred ``stream_region`` tags while the page template is
+    rendered and yields the chunks of the page afterwards.
+    '''
+
+    context_name = 'MC_PAGE_STREAM'
+
+    def __init__(self):
+        self.marker = '<!--django-mc-stream-{0}-'.format(uuid.uuid4().hex)
+        self.marker_regex = re.compile(re.escape(self.marker) + r'(\d+)-->')
+        self.deferred = []
+
+    def defer(self, nodelist, context):
+        '''
+        Remember ``nodelist`` to be rendered with a copy of the current state
+        of ``context``. Returns the marker that is used as placeholder in the
+        rendered page template.
+        '''
+        context = copy(context)
+        # copy the context dicts as well, they are changed in place by tags
+        # like {% for %}
+        context.dicts = [dict(d) for d in context.dicts]
+        self.deferred.append((nodelist, context))
+        return '{0}{1}-->'.format(self.marker, len(self.deferred) - 1)
+
+    def render(self, index):
+        nodelist, context = self.deferred[index]
+        with context.push({self.context_name: None}):
+            return nodelist.render(context)
+
+    def chunks(self, page):
+        '''
+        Yield the rendered ``page`` in chunks, the placeholders are replaced
+        by the rendered ``stream_region`` tags.
+        '''
+        parts = self.marker_regex.split(page)
+        yield parts[0]
+        for i in range(1, len(parts), 2):
+            yield self.render(int(parts[i]))
+            if parts[i + 1]:
+                yield parts[i + 1]
@@ -0,0 +1,146 @@
+'''
+An index of the existing template files, used to prune the template name
+candidates that are generated from template hints.
+
+Template hints produce long candidate lists like::
+
+    app/_component_partial_region-main.html
+    app/_component_partial_layout-home.html
+    app/_component_partial_layout-default.html
+    app/_component_partial.html
+
+Most of them don't exist, but every miss costs a file system lookup in every
+template directory. The index scans the template directories once and removes
+the candidates that don't exist before the template loaders are asked. It is
+enabled with the ``MC_TEMPLATE_INDEX`` setting and is only used if all
+templates are loaded from the file system (by the ``filesystem`` and
+``app_directories`` loaders, optionally wrapped in the ``cached`` loader).
+
+In ``DEBUG`` mode the modification times of the template directories are
+checked at most every ``TemplateIndex.check_interval`` seconds, so new
+templates are found without restarting the server.
+'''
+import os
+import time
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+from .settings import MC_TEMPLATE_INDEX
+
+
+FILESYSTEM_LOADERS = (
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+)
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+class TemplateIndex(object):
+    check_interval = 1.0
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.names = None
+        self.directory_mtimes = {}
+        self.last_check = 0
+
+    def get_directories(self):
+        '''
+        Return the template directories of all template engines, or ``None``
+        if templates might be loaded from somewhere else.
+        '''
+        directories = []
+        for engine in engines.all():
+            if not isinstance(engine, DjangoTemplates):
+                return None
+            loaders = []
+            for loader in engine.engine.loaders:
+                if isinstance(loader, (list, tuple)):
+                    if loader[0] != CACHED_LOADER:
+                        return None
+                    loaders.extend(loader[1])
+                else:
+                    loaders.append(loader)
+            for loader in loaders:
+                if loader == FILESYSTEM_LOADERS[0]:
+                    directories.extend(engine.engine.dirs)
+                elif loader == FILESYSTEM_LOADERS[1]:
+                    directories.extend(get_app_template_dirs('templates'))
+                else:
+                    return None
+        return directories
+
+    def build(self):
+        '''
+        Scan the template directories. ``names`` is set to ``False`` if the
+        index cannot be used with the configured template loaders.
+        '''
+        directories = self.get_directories()
+        if directories is None:
+            self.names = False
+            return
+        names = set()
+        directory_mtimes = {}
+        for directory in directories:
+            for path, dirnames, filenames in os.walk(directory, followlinks=True):
+                directory_mtimes[path] = os.stat(path).st_mtime
+                relative_path = os.path.relpath(path, directory)
+                for filename in filenames:
+                    if relative_path == os.curdir:
+                        name = filename
+                    else:
+                        name = os.path.join(relative_path, filename)
+                    names.add(name.replace(os.sep, '/'))
+        self.names = names
+        self.directory_mtimes = directory_mtimes
+        self.last_check = time.time()
+
+    def is_stale(self):
+        now = time.time()
+        if now - self.last_check < self.check_interval:
+            return False
+        self.last_check = now
+        for path, mtime in self.directory_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def filter(self, template_names):
+        '''
+        Return the template names that exist. If the index cannot be used, or
+        none of the templates exists (so the loaders can report the missing
+        templates), all template names are returned.
+        '''
+        if self.names is None or (settings.DEBUG and self.names is not False and self.is_stale()):
+            self.build()
+        if self.names is False:
+            return template_names
+        existing = [name for name in template_names if name in self.names]
+        return existing or template_names
+
+
+template_index = TemplateIndex()
+
+
+def prune_template_names(template_names):
+    '''
+    Remove the template names that don't exist, if ``MC_TEMPLATE_INDEX`` is
+    enabled.
+    '''
+    if not MC_TEMPLATE_INDEX:
+        return template_names
+    return template_index.filter(template_names)
+
+
+@receiver(setting_changed)
+def clear_template_index(setting, **kwargs):
+    if setting in ('TEMPLATES', 'TEMPLATE_DIRS', 'TEMPLATE_LOADERS', 'INSTALLED_APPS'):
+        template_index.clear()
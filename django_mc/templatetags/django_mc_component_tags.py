@@ -1,7 +1,10 @@
 from django import template
 from django.template import Variable, TemplateSyntaxError
-from django.template.loader import render_to_string
+from django.template.loader import select_template
+from .. import instrumentation
 from ..mixins import CompositeTemplateHintProvider
+from ..settings import MC_MAX_TEMPLATE_HINTS
+from ..template_index import prune_template_names
 
 
 register = template.Library()
@@ -30,20 +33,50 @@ class RenderComponentNode(template.Node):
 
     This will render ``gallery.image.0`` with the hint providers ``[gallery,
     layout]``.
+
+    Add ``only`` as last argument to render the component with an isolated
+    context, that only contains the component's context data::
+
+        {% render_component image for layout only %}
+
+    The template type defaults to ``"partial"`` and can be changed with
+    ``as``. ``max_hints`` limits the number of hinted template names that
+    are tried before the fallback template, it defaults to the
+    ``MC_MAX_TEMPLATE_HINTS`` setting::
+
+        {% render_component image for gallery layout as "teaser" max_hints=2 %}
     '''
 
     parent_hint_providers_variable_name = 'PARENT_HINT_PROVIDER'
 
-    # TODO: It might be useful to change the template_type via the template
-    # tag. A suggested syntax would use the 'as' keyword:
-    #     {% render_component obj for layout as "partial" %}
     template_type = 'partial'
 
-    def __init__(self, component_var, template_hint_providers):
+    def __init__(self, component_var, template_hint_providers, isolated_context=False,
+                 template_type_var=None, max_hints_var=None):
         self.component_var = component_var
         self.template_hint_providers = template_hint_providers
+        self.isolated_context = isolated_context
+        self.template_type_var = template_type_var
+        self.max_hints_var = max_hints_var
+
+    def get_template_type(self, context):
+        if self.template_type_var is None:
+            return self.template_type
+        return self.template_type_var.resolve(context)
+
+    def get_max_hints(self, context):
+        if self.max_hints_var is None:
+            return MC_MAX_TEMPLATE_HINTS
+        return int(self.max_hints_var.resolve(context))
 
     def render(self, context):
+        started = instrumentation.start()
+        try:
+            return self.render_component(context)
+        finally:
+            instrumentation.stop(instrumentation.RENDER_COMPONENT, started)
+
+    def render_component(self, context):
         component = self.component_var.resolve(context)
         hint_providers = [
             hint_provider.resolve(context)
@@ -54,9 +87,16 @@ class RenderComponentNode(template.Node):
             if hint_provider]
 
         composite_hint_providers = CompositeTemplateHintProvider(hint_providers)
+        started = instrumentation.start()
+        template_name_kwargs = {}
+        max_hints = self.get_max_hints(context)
+        if max_hints is not None:
+            template_name_kwargs['max_hints'] = max_hints
         template_names = component.get_template_names(
-            type=self.template_type,
-            hint_providers=hint_providers)
+            type=self.get_template_type(context),
+            hint_providers=hint_providers,
+            **template_name_kwargs)
+        instrumentation.stop(instrumentation.TEMPLATE_NAMES, started)
 
         component_context = {}
         component_context.update(
@@ -68,17 +108,42 @@ class RenderComponentNode(template.Node):
             template_context=context,
             component_context=component_context,
         ))
-        context.update(component_context)
-        try:
-            return render_to_string(template_names, context)
-        finally:
-            context.pop()
+        started = instrumentation.start()
+        template = self.select_template(context, prune_template_names(template_names))
+        instrumentation.stop(instrumentation.SELECT_TEMPLATE, started)
+
+        if self.isolated_context:
+            return template.render(context.new(component_context))
+        with context.push(component_context):
+            return template.render(context)
+
+    def select_template(self, context, template_names):
+        '''
+        Return the first existing template, loaded by the engine that renders
+        the current template (like ``{% include %}`` does).
+        '''
+        if context.template is not None:
+            return context.template.engine.select_template(template_names)
+        return select_template(template_names).template
 
     @classmethod
     def parse(cls, parser, token):
         tokens = token.split_contents()
         tagname = tokens.pop(0)
         component_variable = parser.compile_filter(tokens.pop(0))
+        isolated_context = bool(tokens) and tokens[-1] == 'only'
+        if isolated_context:
+            tokens.pop()
+
+        max_hints_variable = None
+        if tokens and tokens[-1].startswith('max_hints='):
+            max_hints_variable = parser.compile_filter(tokens.pop()[len('max_hints='):])
+
+        template_type_variable = None
+        if len(tokens) >= 2 and tokens[-2] == 'as':
+            template_type_variable = parser.compile_filter(tokens.pop())
+            tokens.pop()
+
         if len(tokens):
             if tokens[0] != 'for':
                 raise TemplateSyntaxError('Second argument for %s must be `for`' % tagname)
@@ -88,7 +153,12 @@ class RenderComponentNode(template.Node):
                 for token in tokens]
         else:
             template_hint_providers = []
-        return cls(component_variable, template_hint_providers)
+        return cls(
+            component_variable,
+            template_hint_providers,
+            isolated_context=isolated_context,
+            template_type_var=template_type_variable,
+            max_hints_var=max_hints_variable)
 
 
 register.tag('render_component', RenderComponentNode.parse)
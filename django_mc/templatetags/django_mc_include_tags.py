@@ -1,8 +1,11 @@
 from itertools import dropwhile
 from itertools import takewhile
 from django import template
+from django.template import TemplateDoesNotExist
 from django.template.loader import select_template
 
+from django_mc import instrumentation
+from django_mc.template_index import prune_template_names
 from django_mc.utils.functional import flatten
 
 
@@ -20,34 +23,72 @@ class HintedIncludeNode(template.Node):
         {% hinted_include "_theme_{hint}.html" using SITE.group %}
 
     Will include the first template
+
+    The selected template is remembered per template name patterns and
+    template hints, so the loaders are only asked once for every combination
+    (also if none of the templates exists). The node lives as long as the
+    template that contains it, so with Django's cached template loader the
+    selection is cached as long as the templates are.
     """
 
+    # Maximum number of remembered template selections per node.
+    cache_size = 256
+
     def __init__(self, template_name_variables, hint_provider_variables):
         self.template_name_variables = template_name_variables
         self.hint_provider_variables = hint_provider_variables
+        if all(var.literal is not None for var in template_name_variables):
+            self.template_name_literals = tuple(
+                var.literal for var in template_name_variables)
+        else:
+            self.template_name_literals = None
+        self.template_cache = {}
 
     def render(self, context):
         hint_providers = [
             var.resolve(context)
             for var in self.hint_provider_variables]
 
-        hints = flatten(
+        hints = tuple(flatten(
             hint_provider.get_template_hints(
                 name_provider=None,
                 hint_providers=hint_providers)
-            for hint_provider in hint_providers)
+            for hint_provider in hint_providers))
 
-        template_names = [
-            var.resolve(context)
-            for var in self.template_name_variables]
+        template_names = self.template_name_literals
+        if template_names is None:
+            template_names = tuple(
+                var.resolve(context)
+                for var in self.template_name_variables)
 
-        template_names = flatten(
-            [template_name.format(hint=hint) for hint in hints]
-            for template_name in template_names)
-
-        tpl = select_template(template_names)
+        tpl = self.select_template(template_names, hints)
         return tpl.render(context)
 
+    def select_template(self, template_names, hints):
+        key = (template_names, hints)
+        try:
+            tpl = self.template_cache[key]
+        except KeyError:
+            started = instrumentation.start()
+            candidates = flatten(
+                [template_name.format(hint=hint) for hint in hints]
+                for template_name in template_names)
+            instrumentation.stop(instrumentation.TEMPLATE_NAMES, started)
+
+            started = instrumentation.start()
+            try:
+                tpl = select_template(prune_template_names(candidates))
+            except TemplateDoesNotExist as e:
+                tpl = e
+            instrumentation.stop(instrumentation.SELECT_TEMPLATE, started)
+
+            if len(self.template_cache) >= self.cache_size:
+                self.template_cache.clear()
+            self.template_cache[key] = tpl
+        if isinstance(tpl, TemplateDoesNotExist):
+            raise tpl
+        return tpl
+
     @classmethod
     def parse(cls, parser, token):
         tokens = token.split_contents()
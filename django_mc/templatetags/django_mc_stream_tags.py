@@ -0,0 +1,40 @@
+from django import template
+
+from django_mc.streaming import PageStream
+
+
+register = template.Library()
+
+
+class StreamRegionNode(template.Node):
+    """
+    Syntax::
+
+        {% stream_region %}...{% endstream_region %}
+
+    Marks a part of the page that is sent as separate chunk if the page is
+    streamed (see ``django_mc.streaming``). The content is rendered in place
+    otherwise.
+    """
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        stream = context.get(PageStream.context_name)
+        if stream is None:
+            return self.nodelist.render(context)
+        return stream.defer(self.nodelist, context)
+
+    @classmethod
+    def parse(cls, parser, token):
+        bits = token.split_contents()
+        if len(bits) != 1:
+            raise template.TemplateSyntaxError(
+                '{0} takes no arguments.'.format(bits[0]))
+        nodelist = parser.parse(('endstream_region',))
+        parser.delete_first_token()
+        return cls(nodelist)
+
+
+register.tag('stream_region', StreamRegionNode.parse)
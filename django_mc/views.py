@@ -1,30 +1,164 @@
-from UserList import UserList
+import heapq
+from collections import Mapping
+from itertools import chain, groupby
+from django.http import Http404, StreamingHttpResponse
+from django.template.loader import select_template
+from django.utils.html import format_html
+from django.utils.translation import ugettext as _
 from django.views.generic import View
 from django.views.generic.detail import BaseDetailView
-from django_mc.mixins import TemplateHintProvider
+from django_mc import instrumentation
+from django_mc.mixins import TemplateHintProvider, prepare_batches
 from django_mc.models import Region, Layout as _Layout
+from django_mc.models import RegionComponentProvider, prefetch_components, region_component_rows
+from django_mc.query_budget import layout_query_budget
+from django_mc.streaming import PageStream
+from django_mc.template_index import prune_template_names
 from django.db.models.loading import get_model
-from .settings import MC_LAYOUT_MODEL
+from .settings import MC_DEFERRED_REGION_OUTPUT, MC_LAYOUT_MODEL
 
 
-class RegionComponentList(TemplateHintProvider, UserList):
+class RegionComponentList(TemplateHintProvider):
     '''
     Wrapper for a region including a list of provided component that will be
     used in the template.
+
+    It behaves like a read only list (iteration, ``len``, indexing), but wraps
+    the given list of components instead of copying it.
     '''
 
+    __slots__ = ('_region', 'data')
+
+    # Deferred regions are rendered separately, see
+    # ``DeferredRegionComponentList``.
+    deferred = False
+    placeholder = ''
+
     def __init__(self, region, data=None):
         self._region = region
-        if data is not None:
-            self.data = list(
-                component
-                for component in data
-                if component is not None)
+        if data is None:
+            data = []
+        elif any(component is None for component in data):
+            data = [component for component in data if component is not None]
+        self.data = data
+
+    @classmethod
+    def from_region_components(cls, region, region_components):
+        '''
+        Resolve the given, already ordered, region components and wrap the
+        result. Components that resolve to ``None`` are left out.
+        '''
+        started = instrumentation.start()
+        components = []
+        append = components.append
+        for region_component in region_components:
+            component = region_component.resolve_component()
+            if component is not None:
+                append(component)
+        instrumentation.stop(
+            instrumentation.RESOLVE_COMPONENT, started,
+            count=len(components))
+        return cls(region, components)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __reversed__(self):
+        return reversed(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __contains__(self, component):
+        return component in self.data
+
+    def __eq__(self, other):
+        if isinstance(other, RegionComponentList):
+            other = other.data
+        return self.data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.data)
+
+    def index(self, component):
+        return self.data.index(component)
+
+    def count(self, component):
+        return self.data.count(component)
 
     def suggest_template_names(self, *args, **kwargs):
         return self._region.suggest_template_names(*args, **kwargs)
 
 
+class DeferredRegionComponentList(RegionComponentList):
+    '''
+    Stands in for the components of a deferred region. It contains no
+    components, render ``placeholder`` to load the region from ``url``
+    instead::
+
+        {{ region.comments.placeholder }}
+    '''
+
+    __slots__ = ('url', 'placeholder')
+
+    deferred = True
+
+    def __init__(self, region, url, placeholder):
+        super(DeferredRegionComponentList, self).__init__(region)
+        self.url = url
+        self.placeholder = placeholder
+
+
+class LazyRegionComponentLists(Mapping):
+    '''
+    Read only mapping of region slugs to ``RegionComponentList`` objects. The
+    components of a region are resolved and prepared (see
+    ``LayoutMixin.prepare_components``) when the region is accessed the first
+    time.
+    '''
+
+    def __init__(self, view, components_by_region):
+        self.view = view
+        self.components_by_region = components_by_region
+        self.request_context = None
+        self.resolved = {}
+
+    def __getitem__(self, slug):
+        try:
+            return self.resolved[slug]
+        except KeyError:
+            pass
+        region = Region.objects.regions_by_slug().get(slug)
+        if region is None or region.pk not in self.components_by_region:
+            raise KeyError(slug)
+        components = self.components_by_region[region.pk]
+
+        if not self.view.is_deferred(region):
+            started = instrumentation.start()
+            prefetch_components(components)
+            instrumentation.stop(instrumentation.RESOLVE_COMPONENT, started, count=0)
+
+        region_components = self.view.get_region_component_list(region, components)
+        self.view.prepare_components({slug: region_components}, self.request_context)
+        self.resolved[slug] = region_components
+        return region_components
+
+    def __iter__(self):
+        regions_mapping = Region.objects.region_pk_to_slug()
+        return (regions_mapping[region_id] for region_id in self.components_by_region)
+
+    def __len__(self):
+        return len(self.components_by_region)
+
+
 class LayoutMixin(object):
     '''
     This mixin provides methods to easily write a detail view that changes its
@@ -37,9 +171,39 @@ class LayoutMixin(object):
     * ``get_hint_providers``
 
     See the docstrings on those methods for their purpose.
+
+    The number of queries the view may use is computed by
+    ``get_query_budget`` and checked by
+    ``django_mc.query_budget.QueryBudgetMiddleware``. Increase
+    ``extra_query_budget`` if the view does additional queries on its own.
+
+    Set ``database_ordering`` to ``True`` to let the database merge and order
+    the components of all providers in a single query (see
+    ``get_database_ordered_components``). ``order_component_list`` is not used
+    in that case, components are ordered by their ``position``.
+
+    Set ``streaming`` to ``True`` to send the page as ``StreamingHttpResponse``
+    in chunks, see ``django_mc.streaming``. The components of a region are
+    then resolved and prepared when the region is rendered, which costs some
+    more queries if component types appear in multiple regions. The query
+    budget is not checked for streamed pages.
+
+    Regions that are marked as ``deferred`` are not rendered with the page.
+    Their components are not resolved and the template gets a
+    ``DeferredRegionComponentList`` with a placeholder (see
+    ``get_deferred_placeholder``) instead. The placeholder loads the region
+    from the same view, with the region's slug in the ``fragment_parameter``
+    GET parameter. The view then only renders that region, using the
+    templates from ``get_fragment_template_names``. So the page can be cached
+    as a whole, while the deferred regions are loaded separately.
     '''
 
     layout_slug = None
+    database_ordering = False
+    streaming = False
+    fragment_parameter = 'mc_region'
+    fragment_region = None
+    extra_query_budget = 0
 
     def get_layout(self):
         '''
@@ -68,8 +232,51 @@ class LayoutMixin(object):
         else:
             self.object = None
         self.layout = self.get_layout()
+        self.fragment_region = self.get_fragment_region()
         return super(LayoutMixin, self).dispatch(request, *args, **kwargs)
 
+    def get_fragment_region(self):
+        '''
+        Return the deferred region that is requested in the
+        ``fragment_parameter``, or ``None`` to render the whole page.
+        '''
+        slug = self.request.GET.get(self.fragment_parameter)
+        if slug is None:
+            return None
+        region = Region.objects.regions_by_slug().get(slug)
+        if region is None or not region.deferred:
+            raise Http404(_('No deferred region "{0}" found.').format(slug))
+        return region
+
+    def is_deferred(self, region):
+        '''
+        Return whether ``region`` is rendered separately and only gets a
+        placeholder in this response.
+        '''
+        return region.deferred and self.fragment_region is None
+
+    def get_fragment_url(self, region):
+        query = self.request.GET.copy()
+        query[self.fragment_parameter] = region.slug
+        return '{0}?{1}'.format(self.request.path, query.urlencode())
+
+    def get_deferred_placeholder(self, region, url):
+        '''
+        Return the markup that loads the deferred ``region`` from ``url``,
+        depending on the ``MC_DEFERRED_REGION_OUTPUT`` setting.
+        '''
+        if MC_DEFERRED_REGION_OUTPUT == 'esi':
+            return format_html('<esi:include src="{0}" />', url)
+        return format_html(
+            '<div data-mc-region="{0}" data-mc-src="{1}"></div>', region.slug, url)
+
+    def get_region_component_list(self, region, components):
+        if self.is_deferred(region):
+            url = self.get_fragment_url(region)
+            return DeferredRegionComponentList(
+                region, url, self.get_deferred_placeholder(region, url))
+        return RegionComponentList.from_region_components(region, components)
+
     def get(self, request, *args, **kwargs):
         '''
         This method is specified here to prevent the fetching of
@@ -112,29 +319,212 @@ class LayoutMixin(object):
         regions_by_id = Region.objects.regions_by_pk()
         regions_mapping = Region.objects.region_pk_to_slug()
 
+        component_providers = self._timed_component_providers()
+        components_by_region = self.get_merged_components(component_providers)
+
+        started = instrumentation.start()
+        component_models = prefetch_components(chain.from_iterable(
+            components
+            for region_id, components in components_by_region.iteritems()
+            if not self.is_deferred(regions_by_id[region_id])))
+        instrumentation.stop(instrumentation.RESOLVE_COMPONENT, started, count=0)
+
+        request = getattr(self, 'request', None)
+        if request is not None:
+            request._mc_query_budget = self.get_query_budget(
+                component_providers, component_models)
+
+        # convert components by region id to components by region slug
+        regions = {}
+        for region_id, components in components_by_region.iteritems():
+            regions[regions_mapping[region_id]] = self.get_region_component_list(
+                regions_by_id[region_id], components)
+        return regions
+
+    def _timed_component_providers(self):
+        started = instrumentation.start()
+        component_providers = self.get_component_providers()
+        instrumentation.stop(instrumentation.LAYOUT_CHAIN, started)
+        return component_providers
+
+    def get_merged_components(self, component_providers):
+        '''
+        Return a dict of the format::
+
+            {
+                region.pk: [region_component_obj, region_component_obj, ...]
+            }
+
+        The region components of all component providers are merged following
+        the region extend rules and ordered. The components are not resolved
+        yet. Only the requested region is returned if a deferred region is
+        rendered.
+        '''
+        if self.database_ordering:
+            components_by_region = self.get_database_ordered_components(component_providers)
+        else:
+            regions_by_id = Region.objects.regions_by_pk()
+            components_by_region = {}
+            for component_provider in component_providers:
+                started = instrumentation.start()
+                provided_components = component_provider.get_components_by_region()
+                instrumentation.stop(
+                    instrumentation.COMPONENTS_BY_REGION, started,
+                    provider=component_provider)
+                for region_id, region_components in provided_components.iteritems():
+                    components_by_region[region_id] = regions_by_id[region_id].extend_components(
+                        components_by_region.get(region_id, []),
+                        region_components,
+                    )
+            for region_id, components in components_by_region.iteritems():
+                components_by_region[region_id] = self.order_component_list(components)
+
+        if self.fragment_region is not None:
+            region_id = self.fragment_region.pk
+            components_by_region = {
+                region_id: components_by_region.get(region_id, []),
+            }
+        return components_by_region
+
+    def get_lazy_components_for_regions(self):
+        '''
+        Like ``get_components_for_regions`` but the components of a region are
+        only resolved and prepared when the region is accessed the first time.
+        Used for streaming responses, see ``streaming``.
+        '''
+        component_providers = self._timed_component_providers()
+        return LazyRegionComponentLists(
+            self, self.get_merged_components(component_providers))
+
+    def get_query_budget(self, component_providers, component_models):
+        '''
+        Return the maximum number of queries this view may execute for the
+        given component providers and component models, see
+        ``django_mc.query_budget.layout_query_budget``.
+        '''
+        return layout_query_budget(
+            len(component_providers),
+            len(component_models),
+            extra=self.extra_query_budget)
+
+    def get_database_ordered_components(self, providers):
+        '''
+        Return a dict of the format::
+
+            {
+                region.pk: [region_component_obj, region_component_obj, ...]
+            }
+
+        The intermediary tables of all given model component providers are queried
+        at once (see ``django_mc.models.region_component_rows``), ordered by
+        region and position. The region extend rules are then applied in a
+        single pass over the result and only the remaining region components
+        are loaded, using one query per intermediary model.
+
+        Component providers that are no ``RegionComponentProvider`` instances
+        (like the ``PageView``) are merged in using their
+        ``get_components_by_region`` method.
+        '''
+        regions_by_id = Region.objects.regions_by_pk()
+        started = instrumentation.start()
+
+        extra_rows = []
+        for depth, provider in enumerate(providers):
+            if isinstance(provider, RegionComponentProvider):
+                continue
+            for region_id, region_components in provider.get_components_by_region().iteritems():
+                for index, component in enumerate(region_components):
+                    extra_rows.append(
+                        (region_id, component.position, depth, index, component))
+        extra_rows.sort(key=lambda row: row[:4])
+
+        rows = heapq.merge(region_component_rows(providers), extra_rows)
+
+        selected = []
+        pks_by_model = {}
+        for region_id, region_rows in groupby(rows, key=lambda row: row[0]):
+            region_rows = regions_by_id[region_id].extend_component_rows(region_rows)
+            for row in region_rows:
+                if len(row) == 4:
+                    model = providers[row[2]].RegionComponent
+                    pks_by_model.setdefault(model, []).append(row[3])
+            selected.append((region_id, region_rows))
+
+        instances_by_model = dict(
+            (model, model._default_manager.in_bulk(pks))
+            for model, pks in pks_by_model.iteritems())
+
         components_by_region = {}
-        for component_provider in self.get_component_providers():
-            for region_id, region_components in component_provider.get_components_by_region().iteritems():
-                components_by_region[region_id] = regions_by_id[region_id].extend_components(
-                    components_by_region.get(region_id, []),
-                    region_components,
-                )
-
-        return dict([  # convert components by region id to components by region slug
-            (
-                regions_mapping[region_id],
-                RegionComponentList(regions_by_id[region_id], [
-                    c.resolve_component() for c in self.order_component_list(components)
-                ]),
-            )
-            for region_id, components
-            in components_by_region.iteritems()
-        ])
+        for region_id, region_rows in selected:
+            components = []
+            for row in region_rows:
+                if len(row) == 4:
+                    model = providers[row[2]].RegionComponent
+                    component = instances_by_model[model].get(row[3])
+                    if component is None:
+                        continue  # deleted in the meantime
+                else:
+                    component = row[4]
+                components.append(component)
+            components_by_region[region_id] = components
+        instrumentation.stop(
+            instrumentation.COMPONENTS_BY_REGION, started,
+            count=len(providers))
+        return components_by_region
+
+    def prepare_components(self, regions, context):
+        '''
+        Let the components prepare the data they need for rendering, once per
+        component class for all components on the page (see
+        ``Renderable.prepare_batch``).
+        '''
+        started = instrumentation.start()
+        prepare_batches(chain.from_iterable(regions.itervalues()), context)
+        instrumentation.stop(instrumentation.PREPARE_BATCH, started)
 
     def get_context_data(self, **kwargs):
         kwargs['layout'] = self.layout
-        kwargs['region'] = self.get_components_for_regions()
-        return super(LayoutMixin, self).get_context_data(**kwargs)
+        if self.streaming:
+            kwargs['region'] = self.get_lazy_components_for_regions()
+        else:
+            kwargs['region'] = self.get_components_for_regions()
+        context = super(LayoutMixin, self).get_context_data(**kwargs)
+        if self.streaming:
+            context['region'].request_context = context
+        else:
+            self.prepare_components(context['region'], context)
+        return context
+
+    def get_fragment_template_names(self):
+        '''
+        Return the templates that are used to render a deferred region. The
+        template gets the same context as the page, ``region`` only contains
+        the requested region which is also available as
+        ``region_components``.
+        '''
+        return [
+            'django_mc/region_{0}.html'.format(self.fragment_region.slug),
+            'django_mc/region.html',
+        ]
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.fragment_region is not None:
+            context['region_components'] = context['region'][self.fragment_region.slug]
+            response_kwargs.setdefault('content_type', self.content_type)
+            return self.response_class(
+                request=self.request,
+                template=self.get_fragment_template_names(),
+                context=context,
+                using=self.template_engine,
+                **response_kwargs)
+        if not self.streaming:
+            return super(LayoutMixin, self).render_to_response(context, **response_kwargs)
+        stream = PageStream()
+        context[PageStream.context_name] = stream
+        template = select_template(self.get_template_names(), using=self.template_engine)
+        page = template.render(context, self.request)
+        response_kwargs.setdefault('content_type', self.content_type)
+        return StreamingHttpResponse(stream.chunks(page), **response_kwargs)
 
     def get_hint_providers(self):
         '''
@@ -153,7 +543,9 @@ class LayoutMixin(object):
         if self.object and hasattr(self.object, 'suggest_template_names'):
             hint_providers = self.get_hint_providers()
             hint_providers = [self.object] + hint_providers
+            started = instrumentation.start()
             template_names = self.object.get_template_names(hint_providers, type='detail')
+            instrumentation.stop(instrumentation.TEMPLATE_NAMES, started)
         if getattr(self, 'get_template_names', None) is not None:
             template_names = template_names + super(LayoutMixin, self).get_template_names()
-        return template_names
+        return prune_template_names(template_names)
@@ -0,0 +1,131 @@
+'''
+Warm the caches of django_mc after a deploy, used by the ``warm_django_mc``
+management command.
+
+The region components of the component providers are the only data that is
+cached in a shared cache backend (see ``MC_REGION_COMPONENT_CACHE``), so
+they can be warmed by a separate process. ``warm_providers`` fills that cache
+for the given component provider models, spread across a process pool. This
+only works if the cache is shared by all processes, like memcached, Redis or
+the database cache. Per process backends like ``LocMemCache`` (Django's
+default) are refused by the command and by a process pool.
+
+All other caches live in every web process. Call ``warm_process_caches``
+when a process starts (e.g. at the end of your ``wsgi.py``) to load the
+regions, their available components and the template index before the first
+request. The template selection of ``{% hinted_include %}`` is cached with
+the compiled templates and needs the cached template loader.
+'''
+from multiprocessing import Pool
+from django.apps import apps
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from .models import Region, RegionComponentProvider, get_region_component_cache
+from .settings import MC_TEMPLATE_INDEX
+from .template_index import template_index
+
+
+def is_shared_cache(cache):
+    '''
+    Return whether ``cache`` is shared between processes, which is not the
+    case for ``LocMemCache`` and ``DummyCache``.
+    '''
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def get_provider_model(label):
+    '''
+    Return the component provider model for ``label`` (``app_label.Model``).
+    Raises ``LookupError`` for unknown models and ``ValueError`` for models
+    that are no component providers.
+    '''
+    model = apps.get_model(label)
+    if not issubclass(model, RegionComponentProvider):
+        raise ValueError('{0} is no component provider.'.format(label))
+    return model
+
+
+def warm_provider_chunk(label, pks):
+    '''
+    Fill the region component cache of the given objects of the component
+    provider model ``label``. Returns the number of warmed objects.
+    '''
+    model = get_provider_model(label)
+    count = 0
+    for provider in model._default_manager.filter(pk__in=pks):
+        provider.get_components_by_region()
+        count += 1
+    return count
+
+
+def _warm_task(task):
+    return warm_provider_chunk(*task)
+
+
+def _init_worker():
+    # Forked workers must not share the database connections of the parent.
+    connections.close_all()
+
+
+def iter_tasks(labels, chunk_size):
+    '''
+    Yield ``(label, pks)`` tuples with at most ``chunk_size`` primary keys
+    for all objects of the given component provider models.
+    '''
+    for label in labels:
+        model = get_provider_model(label)
+        pks = list(model._default_manager.order_by('pk').values_list('pk', flat=True))
+        for i in range(0, len(pks), chunk_size):
+            yield label, pks[i:i + chunk_size]
+
+
+def warm_providers(labels, processes=1, chunk_size=100, progress=None):
+    '''
+    Fill the region component cache for all objects of the given component
+    provider models, using a pool of ``processes`` worker processes (or the
+    current process if ``processes`` is 1). ``progress`` is called with the
+    number of warmed and of all objects after every chunk. Returns the number
+    of warmed objects.
+
+    Raises ``ImproperlyConfigured`` for more than one process if the region
+    component cache is not shared between processes.
+    '''
+    tasks = list(iter_tasks(labels, chunk_size))
+    total = sum(len(pks) for label, pks in tasks)
+    if processes > 1 and len(tasks) > 1:
+        if not is_shared_cache(get_region_component_cache()):
+            raise ImproperlyConfigured(
+                'The worker processes cannot warm the region component cache, '
+                'MC_REGION_COMPONENT_CACHE is not shared between processes.')
+        connections.close_all()
+        pool = Pool(min(processes, len(tasks)), initializer=_init_worker)
+        try:
+            results = list(_report(pool.imap_unordered(_warm_task, tasks), total, progress))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = list(_report((_warm_task(task) for task in tasks), total, progress))
+    return sum(results)
+
+
+def _report(results, total, progress):
+    done = 0
+    for count in results:
+        done += count
+        if progress is not None:
+            progress(done, total)
+        yield count
+
+
+def warm_process_caches():
+    '''
+    Fill the caches of the current process: the regions, their available
+    components and, if ``MC_TEMPLATE_INDEX`` is enabled, the template index.
+    '''
+    Region.objects.fill_cache()
+    Region.objects.fill_available_components_cache()
+    if MC_TEMPLATE_INDEX:
+        template_index.build()
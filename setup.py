@@ -26,7 +26,7 @@ setup(
     author=u'David Danier',
     author_email='david.danier@team23.de',
     packages=find_packages(
-        exclude=['tests', 'tests.*']),
+        exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*']),
     include_package_data=True,
     url='https://git.team23.de/team23/django_mc',
     license='BSD licence, see LICENSE file',
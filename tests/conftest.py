@@ -0,0 +1,30 @@
+import pytest
+from django_mc.models import Layout, Region
+from tests.models import Page, TextComponent
+
+
+@pytest.fixture
+def page(db):
+    Region.objects.clear_cache()
+    main = Region.objects.create(
+        name='Main', slug='main', component_extend_rule=Region.COMBINE)
+    sidebar = Region.objects.create(
+        name='Sidebar', slug='sidebar', component_extend_rule=Region.OVERWRITE)
+    parent = Layout.objects.create(name='Default', slug='default')
+    layout = Layout.objects.create(name='Home', slug='home', parent=parent)
+    page = Page.objects.create(title='Page', layout=layout)
+
+    def add(provider, region, position, text):
+        provider.region_components.create(
+            region=region,
+            component=TextComponent.objects.create(text=text),
+            position=position)
+
+    add(parent, main, 1, 'parent-1')
+    add(parent, main, 3, 'parent-3')
+    add(parent, sidebar, 0, 'parent-sidebar')
+    add(layout, main, 2, 'layout-2')
+    add(layout, sidebar, 5, 'layout-sidebar-5')
+    add(layout, sidebar, 1, 'layout-sidebar-1')
+    add(page, main, 1, 'page-1')
+    return page
@@ -0,0 +1,10 @@
+from django_mc.link import ModelLinkResolver, register
+from .models import Page
+
+
+class PageLinkResolver(ModelLinkResolver):
+    def __init__(self):
+        super(PageLinkResolver, self).__init__(Page)
+
+
+register('page', PageLinkResolver())
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mc', '0003_add_region_position_field'),
+        migrations.swappable_dependency(settings.MC_LAYOUT_MODEL),
+        migrations.swappable_dependency(settings.MC_COMPONENT_BASE_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Page',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('title', models.CharField(max_length=50)),
+                ('layout', models.ForeignKey(to=settings.MC_LAYOUT_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PageRegionComponent',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('position', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'tests_page_regioncomponent',
+                'db_tablespace': '',
+            },
+        ),
+        migrations.CreateModel(
+            name='TextComponent',
+            fields=[
+                ('componentbase_ptr', models.OneToOneField(parent_link=True, auto_created=True, primary_key=True, serialize=False, to=settings.MC_COMPONENT_BASE_MODEL)),
+                ('text', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+                'verbose_name': 'Component Base',
+                'verbose_name_plural': 'Component Bases',
+            },
+            bases=('django_mc.componentbase',),
+        ),
+        migrations.AddField(
+            model_name='pageregioncomponent',
+            name='component',
+            field=models.ForeignKey(related_name='+', to=settings.MC_COMPONENT_BASE_MODEL),
+        ),
+        migrations.AddField(
+            model_name='pageregioncomponent',
+            name='provider',
+            field=models.ForeignKey(related_name='region_components', to='tests.Page'),
+        ),
+        migrations.AddField(
+            model_name='pageregioncomponent',
+            name='region',
+            field=models.ForeignKey(related_name='+', to='django_mc.Region'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pageregioncomponent',
+            name='visible_from',
+            field=models.DateTimeField(db_index=True, null=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='pageregioncomponent',
+            name='visible_until',
+            field=models.DateTimeField(db_index=True, null=True, blank=True),
+        ),
+    ]
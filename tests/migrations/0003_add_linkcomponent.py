@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django_mc.link.fields
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mc', '0006_add_region_component_visibility'),
+        ('tests', '0002_add_region_component_visibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkComponent',
+            fields=[
+                ('componentbase_ptr', models.OneToOneField(parent_link=True, auto_created=True, primary_key=True, serialize=False, to=settings.MC_COMPONENT_BASE_MODEL)),
+                ('link', django_mc.link.fields.LinkField(help_text='You can enter full URLs, absolute paths (starting with a slash) or a link it that represents a content in the CMS. These usually look like "page/123".', max_length=250, blank=True)),
+                ('more_link', django_mc.link.fields.LinkField(help_text='You can enter full URLs, absolute paths (starting with a slash) or a link it that represents a content in the CMS. These usually look like "page/123".', max_length=250, blank=True)),
+            ],
+            options={
+                'abstract': False,
+                'verbose_name': 'Component Base',
+                'verbose_name_plural': 'Component Bases',
+            },
+            bases=('django_mc.componentbase',),
+        ),
+    ]
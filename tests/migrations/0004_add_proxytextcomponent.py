@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0003_add_linkcomponent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProxyTextComponent',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+            },
+            bases=('tests.textcomponent',),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import models
+from django_mc.link import LinkField
+from django_mc.models import ComponentBase, RegionComponentProvider
+
+
+class Page(RegionComponentProvider):
+    title = models.CharField(max_length=50)
+    layout = models.ForeignKey('django_mc.Layout')
+
+    def get_absolute_url(self):
+        return '/page/{0}/'.format(self.pk)
+
+
+class TextComponent(ComponentBase):
+    text = models.TextField(blank=True)
+
+
+class ProxyTextComponent(TextComponent):
+    class Meta:
+        proxy = True
+
+
+class LinkComponent(ComponentBase):
+    link = LinkField(blank=True)
+    more_link = LinkField(blank=True)
@@ -15,6 +15,7 @@ USE_I18N = True
 USE_L10N = True
 
 INSTALLED_APPS = [
+    'django.contrib.contenttypes',
     'django_mc',
     'django_mc.link',
     'tests',
@@ -35,3 +36,6 @@ STATIC_URL = '/static/'
 SECRET_KEY = '0'
 
 SITE_ID = 1
+
+MC_LAYOUT_MODEL = 'django_mc.Layout'
+MC_COMPONENT_BASE_MODEL = 'django_mc.ComponentBase'
@@ -0,0 +1,75 @@
+from django.template import Context, Template
+from django.test.utils import override_settings
+from django_mc.mixins import CompositeTemplateHintProvider, Renderable
+from tests.test_mixins import Hints
+
+
+class Teaser(Renderable):
+    def __init__(self, title):
+        self.title = title
+
+    def get_app_label(self):
+        return 'app'
+
+    def get_model_name(self):
+        return 'teaser'
+
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'app/_teaser.html': '{{ teaser.title }}|{{ page_title }}',
+                'app/teaser_teaser.html': '{{ teaser.title }}|{{ page_title }}',
+            }),
+        ],
+    },
+}]
+
+
+def render(template_code, **context):
+    template = Template(
+        '{% load django_mc_component_tags %}' + template_code)
+    return template.render(Context(context))
+
+
+def test_render_component():
+    with override_settings(TEMPLATES=TEMPLATES):
+        # The component's context is removed again after rendering.
+        assert render(
+            '{% render_component item %}|{{ object.title }}',
+            item=Teaser('Hello'),
+            page_title='Page') == 'Hello|Page|'
+
+
+def test_render_component_with_isolated_context():
+    with override_settings(TEMPLATES=TEMPLATES):
+        assert render(
+            '{% render_component item only %}',
+            item=Teaser('Hello'),
+            page_title='Page') == 'Hello|'
+
+
+def test_render_component_options(monkeypatch):
+    names = []
+    get_template_names = Teaser.get_template_names
+
+    def recording_get_template_names(self, *args, **kwargs):
+        names.extend(get_template_names(self, *args, **kwargs))
+        return names
+
+    monkeypatch.setattr(Teaser, 'get_template_names', recording_get_template_names)
+    gallery = CompositeTemplateHintProvider([Hints('gallery')])
+    parent = CompositeTemplateHintProvider([Hints('region-main', 'layout-home')])
+    with override_settings(TEMPLATES=TEMPLATES):
+        assert render(
+            '{% render_component item for gallery parent as "teaser" max_hints=2 only %}',
+            item=Teaser('Hello'),
+            gallery=gallery,
+            parent=parent) == 'Hello|'
+    assert names == [
+        'app/teaser_teaser_gallery.html',
+        'app/teaser_teaser_region-main.html',
+        'app/teaser_teaser.html',
+    ]
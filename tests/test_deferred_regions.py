@@ -0,0 +1,76 @@
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django_mc import views
+from django_mc.models import Region
+from django_mc.views import DeferredRegionComponentList
+from tests.test_views import describe, get_view
+
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'django_mc/region.html': (
+                    '{% for component in region_components %}'
+                    '{{ component.text }},{% endfor %}'),
+            }),
+        ],
+    },
+}]
+
+
+def defer_sidebar():
+    Region.objects.filter(slug='sidebar').update(deferred=True)
+    Region.objects.clear_cache()
+
+
+def get_deferred_view(page, path='/page/', **data):
+    view = get_view(page)
+    view.request = RequestFactory().get(path, data)
+    view.fragment_region = view.get_fragment_region()
+    return view
+
+
+def test_deferred_region_is_replaced_by_placeholder(page):
+    defer_sidebar()
+    regions = get_deferred_view(page).get_components_for_regions()
+    sidebar = regions['sidebar']
+    assert isinstance(sidebar, DeferredRegionComponentList)
+    assert list(sidebar) == []
+    assert sidebar.url == '/page/?mc_region=sidebar'
+    assert sidebar.placeholder == '<esi:include src="/page/?mc_region=sidebar" />'
+    assert not regions['main'].deferred
+    assert regions['main'].placeholder == ''
+    assert len(regions['main']) == 5
+
+
+def test_fragment_placeholder(page, monkeypatch):
+    defer_sidebar()
+    monkeypatch.setattr(views, 'MC_DEFERRED_REGION_OUTPUT', 'fragment')
+    view = get_deferred_view(page, q='x')
+    sidebar = view.get_components_for_regions()['sidebar']
+    assert sidebar.placeholder == (
+        '<div data-mc-region="sidebar" '
+        'data-mc-src="/page/?q=x&amp;mc_region=sidebar"></div>')
+
+
+def test_render_deferred_region(page):
+    defer_sidebar()
+    view = get_deferred_view(page, mc_region='sidebar')
+    assert describe(view.get_components_for_regions()) == {
+        'sidebar': ['layout-sidebar-1', 'layout-sidebar-5'],
+    }
+    with override_settings(TEMPLATES=TEMPLATES):
+        response = view.get(view.request)
+        response.render()
+    assert response.content == b'layout-sidebar-1,layout-sidebar-5,'
+
+
+def test_only_deferred_regions_can_be_requested(page):
+    with pytest.raises(Http404):
+        get_deferred_view(page, mc_region='sidebar')
+    with pytest.raises(Http404):
+        get_deferred_view(page, mc_region='unknown')
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from StringIO import StringIO
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.utils import timezone
+from django_mc.models import Layout, Region
+from tests.models import Page, TextComponent
+from tests.test_views import describe, get_view
+
+
+def test_flatten_layout(page):
+    expected = describe(get_view(page).get_components_for_regions())
+    layout = page.layout
+    layout.flatten()
+
+    assert layout.flattened
+    assert layout.get_component_providers() == [layout]
+    # the sidebar is copied too, the layout's own components overwrite it
+    assert sorted(
+        layout.region_components.filter(inherited=True).values_list('position', flat=True)
+    ) == [0, 1, 3]
+    assert describe(get_view(page).get_components_for_regions()) == expected
+    view = get_view(page, database_ordering=True)
+    assert describe(view.get_components_for_regions()) == expected
+
+    layout.unflatten()
+    assert not Layout.objects.get(pk=layout.pk).flattened
+    assert not layout.region_components.filter(inherited=True).exists()
+    assert describe(get_view(page).get_components_for_regions()) == expected
+
+
+def test_flattened_overwrite_falls_back_to_the_parents(page):
+    layout = page.layout
+    layout.flatten()
+    layout.region_components.filter(inherited=False, region__slug='sidebar').update(
+        visible_from=timezone.now() + timedelta(hours=1))
+    for database_ordering in (False, True):
+        view = get_view(page, database_ordering=database_ordering)
+        assert describe(view.get_components_for_regions())['sidebar'] == ['parent-sidebar']
+
+    layout.region_components.filter(inherited=False, region__slug='sidebar').update(
+        visible_from=None)
+    for database_ordering in (False, True):
+        view = get_view(page, database_ordering=database_ordering)
+        assert describe(view.get_components_for_regions())['sidebar'] == [
+            'layout-sidebar-1', 'layout-sidebar-5']
+
+
+def test_flatten_nested_layouts(page):
+    child = Layout.objects.create(name='Child', slug='child', parent=page.layout)
+    page.layout = child
+    page.save()
+    expected = describe(get_view(page).get_components_for_regions())
+    assert expected['sidebar'] == ['layout-sidebar-1', 'layout-sidebar-5']
+
+    page.layout.parent.flatten()
+    child.flatten()
+    assert describe(get_view(page).get_components_for_regions()) == expected
+    view = get_view(page, database_ordering=True)
+    assert describe(view.get_components_for_regions()) == expected
+
+
+def test_flatten_needs_the_inherited_field(page):
+    layout = page.layout
+    layout.RegionComponent = Page.RegionComponent
+    with pytest.raises(ImproperlyConfigured):
+        layout.flatten()
+    with pytest.raises(ImproperlyConfigured):
+        layout.unflatten()
+
+
+def test_sync_flattened_layouts(page):
+    layout = page.layout
+    layout.flatten()
+    main = Region.objects.regions_by_slug()['main']
+    layout.parent.region_components.create(
+        region=main, component=TextComponent.objects.create(text='parent-4'), position=4)
+
+    output = StringIO()
+    call_command('flatten_layouts', stdout=output)
+    assert output.getvalue().strip() == 'Flattened 1 layouts.'
+    page.layout = Layout.objects.get(pk=layout.pk)
+    assert describe(get_view(page).get_components_for_regions())['main'] == [
+        'parent-1', 'page-1', 'layout-2', 'extra', 'parent-3', 'parent-4']
+
+
+def test_flatten_layouts_command(page):
+    call_command('flatten_layouts', 'home', stdout=StringIO())
+    assert Layout.objects.get(slug='home').flattened
+    assert not Layout.objects.get(slug='default').flattened
+    call_command('flatten_layouts', 'home', unflatten=True, stdout=StringIO())
+    assert not Layout.objects.get(slug='home').flattened
@@ -1,3 +1,13 @@
+from benchmarks.imports import ENTRY_POINTS, loaded_forbidden, measure_import
+
+
 def test_imports():
     import django_mc
     import django_mc.link
+
+
+def test_entry_points_load_heavy_modules_lazily():
+    for module, forbidden in ENTRY_POINTS:
+        elapsed, modules, report = measure_import(module)
+        assert module in modules
+        assert loaded_forbidden(modules, forbidden) == []
@@ -0,0 +1,55 @@
+import pytest
+from django.template import Context, Template, TemplateDoesNotExist
+from django.test.utils import override_settings
+from django_mc.mixins import TemplateHintProvider
+
+
+class HintProvider(TemplateHintProvider):
+    def __init__(self, *hints):
+        self.hints = list(hints)
+
+    def get_template_hints(self, name_provider, hint_providers):
+        return self.hints
+
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'theme_dark.html': 'dark',
+                'theme.html': 'default',
+            }),
+        ],
+    },
+}]
+
+
+def test_hinted_include_caches_template_selection(monkeypatch):
+    from django_mc.templatetags import django_mc_include_tags
+
+    calls = []
+    select_template = django_mc_include_tags.select_template
+
+    def counting_select_template(template_names):
+        calls.append(template_names)
+        return select_template(template_names)
+
+    monkeypatch.setattr(django_mc_include_tags, 'select_template', counting_select_template)
+
+    with override_settings(TEMPLATES=TEMPLATES):
+        template = Template(
+            '{% load django_mc_include_tags %}'
+            '{% hinted_include "theme_{hint}.html" "theme.html" using hints %}')
+        render = lambda *hints: template.render(Context({'hints': HintProvider(*hints)}))
+
+        assert render('dark') == 'dark'
+        assert render('dark') == 'dark'
+        assert render('light') == 'default'
+        assert len(calls) == 2
+
+        with pytest.raises(TemplateDoesNotExist):
+            render()
+        with pytest.raises(TemplateDoesNotExist):
+            render()
+        assert len(calls) == 3
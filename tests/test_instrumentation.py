@@ -0,0 +1,73 @@
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django_mc import instrumentation
+from django_mc.instrumentation import InstrumentationMiddleware, SummaryCollector
+
+
+def test_measurements_are_ignored_without_collector():
+    assert instrumentation.start() is None
+    instrumentation.stop(instrumentation.LAYOUT_CHAIN, None)
+
+
+def test_summary_collector():
+    collector = SummaryCollector()
+    with instrumentation.collect(collector):
+        started = instrumentation.start()
+        instrumentation.stop(instrumentation.RESOLVE_COMPONENT, started, count=3)
+        started = instrumentation.start()
+        instrumentation.stop(instrumentation.RESOLVE_COMPONENT, started, count=2)
+    assert instrumentation.start() is None
+    assert collector.events[instrumentation.RESOLVE_COMPONENT][0] == 5
+    assert collector.summary().startswith('resolve_component;dur=')
+
+
+def test_middleware_writes_server_timing_header():
+    middleware = InstrumentationMiddleware()
+    request = HttpRequest()
+    middleware.process_request(request)
+    started = instrumentation.start()
+    instrumentation.stop(instrumentation.RENDER_COMPONENT, started)
+    response = middleware.process_response(request, HttpResponse())
+    assert response['Server-Timing'].startswith('render_component;dur=')
+    assert instrumentation.start() is None
+
+
+def test_middleware_logs_streaming_responses_when_exhausted(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        instrumentation.logger, 'info', lambda message, *args: logged.append(args))
+
+    def content():
+        started = instrumentation.start()
+        instrumentation.stop(instrumentation.RENDER_COMPONENT, started)
+        yield 'content'
+
+    middleware = InstrumentationMiddleware()
+    request = HttpRequest()
+    request.path = '/page/'
+    middleware.process_request(request)
+    response = middleware.process_response(request, StreamingHttpResponse(content()))
+    assert 'Server-Timing' not in response
+    assert logged == []
+    assert list(response.streaming_content) == ['content']
+    assert instrumentation.start() is None
+    assert len(logged) == 1
+    assert logged[0][0] == '/page/'
+    assert logged[0][1].startswith('render_component;dur=')
+
+
+def test_middleware_deactivates_collector_of_unconsumed_streams(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        instrumentation.logger, 'info', lambda message, *args: logged.append(args))
+    middleware = InstrumentationMiddleware()
+    request = HttpRequest()
+    request.path = '/page/'
+    middleware.process_request(request)
+    started = instrumentation.start()
+    instrumentation.stop(instrumentation.LAYOUT_CHAIN, started)
+    response = middleware.process_response(request, StreamingHttpResponse(iter(['content'])))
+    assert instrumentation.start() is None
+    response.close()
+    response.close()
+    assert len(logged) == 1
+    assert logged[0][1].startswith('layout_chain;dur=')
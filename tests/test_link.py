@@ -0,0 +1,55 @@
+import pytest
+from django.apps import apps
+from django_mc.link import ModelLinkResolver, ResolveError, registry
+from django_mc.link.autodiscover import autodiscover
+from django_mc.link.registry import Registry
+from tests.link_resolvers import PageLinkResolver
+from tests.models import Page
+
+
+@pytest.fixture
+def lazy_registry(request):
+    registry.register('lazy-page', 'tests.link_resolvers.PageLinkResolver')
+    request.addfinalizer(lambda: registry._registry.pop('lazy-page', None))
+    return registry
+
+
+def test_autodiscover_imports_link_resolvers():
+    assert isinstance(registry.get_resolver('page'), PageLinkResolver)
+    timings = apps.get_app_config('django_mc_link').autodiscover_timings
+    assert [label for label, seconds in timings] == ['tests']
+    assert [label for label, seconds in autodiscover()] == ['tests']
+
+
+def test_lazy_resolver_is_imported_on_first_resolve(page, lazy_registry):
+    assert lazy_registry._registry['lazy-page'] == 'tests.link_resolvers.PageLinkResolver'
+    assert lazy_registry.resolve('lazy-page', page.pk) == page.get_absolute_url()
+    assert isinstance(lazy_registry._registry['lazy-page'], PageLinkResolver)
+    with pytest.raises(ResolveError):
+        lazy_registry.resolve('lazy-page', 0)
+
+
+def test_reverse_imports_lazy_resolvers_only_if_needed(page, request):
+    registry.register('broken', 'tests.link_resolvers.Missing')
+    request.addfinalizer(lambda: registry._registry.pop('broken'))
+    assert registry.reverse(page) == 'page/{0}'.format(page.pk)
+    assert registry._registry['broken'] == 'tests.link_resolvers.Missing'
+
+    lazy_registry = Registry()
+    lazy_registry.register('lazy-page', 'tests.link_resolvers.PageLinkResolver')
+    assert lazy_registry.reverse(page) == 'lazy-page/{0}'.format(page.pk)
+    assert isinstance(lazy_registry._registry['lazy-page'], PageLinkResolver)
+
+
+def test_broken_lazy_resolver_is_not_hidden(request):
+    registry.register('broken', 'tests.link_resolvers.Missing')
+    request.addfinalizer(lambda: registry._registry.pop('broken'))
+    with pytest.raises(ImportError):
+        registry.resolve('broken', 1)
+
+
+def test_model_resolver_accepts_model_manager_and_queryset(page):
+    for model_or_qs in (Page, Page.objects, Page.objects.filter(pk=page.pk)):
+        resolver = ModelLinkResolver(model_or_qs)
+        assert resolver.model is Page
+        assert resolver.resolve(page.pk) == page.get_absolute_url()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+import lxml.html
+from django.core.exceptions import ImproperlyConfigured
+from django_mc.link import html_backends
+from django_mc.link.html_backends import BACKENDS, convert_links
+
+
+# Pairs of input and output that all backends must produce exactly. The
+# link ``page/{pk}`` points to the page of the fixture, ``page/0`` does not
+# exist.
+CORPUS = [
+    (u'<p>A <a href="page/{pk}">link</a> and <a href="page/0">a broken one</a>.</p>',
+     u'<p>A <a href="{url}">link</a> and a broken one.</p>'),
+    (u'<p><a href="page/0"><strong>x &amp; y</strong></a>, <a href="page/0">x<em>y</em></a>z</p>',
+     u'<p>x &amp; y, z</p>'),
+    (u'<p><a href="page/0"></a>|<a>anchor</a>|<a href="">empty</a>|'
+     u'<a href="http://example.com/?a=1&amp;b=2">external</a>|<a href="/path/">path</a></p>',
+     u'<p>|<a>anchor</a>|<a href="">empty</a>|'
+     u'<a href="http://example.com/?a=1&amp;b=2">external</a>|<a href="/path/">path</a></p>'),
+    (u'<ul>\n<li><a href="page/{pk}" title="Page">Page</a></li>\n</ul>\n'
+     u'<p>&nbsp;&lt;tag&gt; &quot;quoted&quot; &#228; ü</p>',
+     u'<ul>\n<li><a href="{url}" title="Page">Page</a></li>\n</ul>\n'
+     u'<p>\xa0&lt;tag&gt; "quoted" \xe4 \xfc</p>'),
+    (u'<div><h2>Title</h2><p><a href="page/{pk}"><em>nested</em> link</a></p></div>',
+     u'<div><h2>Title</h2><p><a href="{url}"><em>nested</em> link</a></p></div>'),
+    # Links that are not closed properly.
+    (u'<p><a href="page/0">broken</p><p>Important content</p>',
+     u'<p>broken</p><p>Important content</p>'),
+    (u'<p><a href="page/0"><b>broken</p><p>Important content</p>',
+     u'<p>broken</p><p>Important content</p>'),
+    (u'<p><a href="page/0">one<a href="page/{pk}">two</a> three</p>',
+     u'<p>one<a href="{url}">two</a> three</p>'),
+    (u'<p><a href="page/0"><b>x</i></b></a>y</p>',
+     u'<p>xy</p>'),
+    (u'<p><a href="page/0"/>x</p><p><a href="page/{pk}"/>y</p>',
+     u'<p>x</p><p><a href="{url}"></a>y</p>'),
+]
+
+# Inputs whose unchanged markup is serialized differently by the backends,
+# they are compared after parsing.
+NORMALIZED_CORPUS = [
+    u'<p>Line<br>break <a href="page/0">x<br>y</a><img src="i.png" alt="Image"></p>',
+    u'<p class=intro id=\'first\'><a title="T" href="page/{pk}">link</a></p>',
+    u'<p>A <a href="page/0">link</a></p><p><a href="page/0">not closed',
+]
+
+
+def normalize(html):
+    def tree(element):
+        return (
+            element.tag,
+            sorted(element.attrib.items()),
+            element.text or '',
+            [tree(child) for child in element],
+            element.tail or '')
+    return tree(lxml.html.fragment_fromstring(html, create_parent='div'))
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backends_conform(page, backend):
+    url = page.get_absolute_url()
+    for value, expected in CORPUS:
+        assert convert_links(value.format(pk=page.pk), backend) == expected.format(url=url)
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backends_conform_after_normalization(page, backend):
+    for value in NORMALIZED_CORPUS:
+        value = value.format(pk=page.pk)
+        assert normalize(convert_links(value, backend)) == normalize(
+            convert_links(value, 'bs4'))
+
+
+def test_backend_setting(page, monkeypatch):
+    monkeypatch.setattr(html_backends, 'MC_LINK_HTML_BACKEND', 'html.parser')
+    assert html_backends.get_backend() is html_backends.convert_links_html_parser
+    monkeypatch.setattr(html_backends, 'MC_LINK_HTML_BACKEND', 'unknown')
+    with pytest.raises(ImproperlyConfigured):
+        convert_links(u'<p></p>')
@@ -0,0 +1,51 @@
+from StringIO import StringIO
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_mc.link.validation import BrokenLink, find_broken_links
+from tests.models import LinkComponent
+
+
+@pytest.fixture
+def links(page):
+    values = [
+        ('page/{0}'.format(page.pk), 'http://example.com/'),
+        ('page/0', ''),
+        ('page/abc', '/path/'),
+        ('unknown/1', 'not a link'),
+        ('page/{0}'.format(page.pk), 'page/0'),
+    ]
+    return [
+        LinkComponent.objects.create(link=link, more_link=more_link)
+        for link, more_link in values]
+
+
+def test_find_broken_links(links):
+    with CaptureQueriesContext(connection) as queries:
+        broken_links = list(find_broken_links(LinkComponent.objects.all(), chunk_size=3))
+    assert broken_links == [
+        BrokenLink(links[1].pk, 'link', 'page/0', 'missing'),
+        BrokenLink(links[2].pk, 'link', 'page/abc', 'missing'),
+        BrokenLink(links[3].pk, 'link', 'unknown/1', 'unknown type'),
+        BrokenLink(links[3].pk, 'more_link', 'not a link', 'invalid'),
+        BrokenLink(links[4].pk, 'more_link', 'page/0', 'missing'),
+    ]
+    # Two chunks of objects, each with one query for the values and one for
+    # the pages.
+    assert len(queries) == 4
+    assert 'LIMIT 3' in queries[0]['sql']
+
+
+def test_validate_links_command(links):
+    output = StringIO()
+    call_command(
+        'validate_links', 'tests.LinkComponent.more_link',
+        stdout=output, stderr=StringIO())
+    assert output.getvalue().splitlines() == [
+        'model,pk,field,value,reason',
+        'tests.LinkComponent,{0},more_link,not a link,invalid'.format(links[3].pk),
+        'tests.LinkComponent,{0},more_link,page/0,missing'.format(links[4].pk),
+    ]
+    with pytest.raises(CommandError):
+        call_command('validate_links', 'tests.Page', stdout=StringIO())
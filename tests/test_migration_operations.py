@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.db import connection
+from django.db.migrations.writer import OperationWriter
+from django.test.utils import CaptureQueriesContext
+from django_mc.migration_operations import (
+    AddComponentTypeToRegions, RemoveComponentTypeFromRegions)
+from django_mc.models import Region
+from tests.models import Page, TextComponent
+
+
+def get_region(slug):
+    return Region.objects.regions_by_slug()[slug]
+
+
+def test_add_component_types_to_regions(page):
+    get_region('main').available_components.add(
+        apps.get_model('contenttypes', 'ContentType').objects.get_for_model(TextComponent))
+    operation = AddComponentTypeToRegions('tests', ['TextComponent', 'Page'])
+    with CaptureQueriesContext(connection) as queries:
+        operation.run_forwards(apps, None)
+    # regions, content types, existing rows and one insert
+    assert len(queries) == 4
+    for slug in ('main', 'sidebar'):
+        assert get_region(slug).accepts(TextComponent)
+        assert get_region(slug).accepts(Page)
+    assert get_region('main').available_components.count() == 2
+
+    operation.run_backwards(apps, None)
+    assert not get_region('main').accepts(TextComponent)
+    assert not get_region('sidebar').accepts(Page)
+
+
+def test_remove_component_type_from_regions(page):
+    AddComponentTypeToRegions('tests', 'TextComponent').run_forwards(apps, None)
+    operation = RemoveComponentTypeFromRegions(
+        'tests', 'TextComponent', regions=['sidebar'])
+    operation.run_forwards(apps, None)
+    assert get_region('main').accepts(TextComponent)
+    assert not get_region('sidebar').accepts(TextComponent)
+
+
+def test_operations_can_be_serialized():
+    operation = AddComponentTypeToRegions(
+        'tests', ['TextComponent'], regions=['main'], elidable=True)
+    assert operation.deconstruct() == (
+        'AddComponentTypeToRegions',
+        ['tests', ['TextComponent']],
+        {'regions': ['main'], 'elidable': True})
+    code, imports = OperationWriter(operation).serialize()
+    assert 'import django_mc.migration_operations' in imports
+    assert code.strip().startswith(
+        'django_mc.migration_operations.AddComponentTypeToRegions(')
+    assert 'elidable=True' in code
+    assert AddComponentTypeToRegions('tests', 'TextComponent').deconstruct()[2] == {}
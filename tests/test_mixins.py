@@ -0,0 +1,73 @@
+from django.template import Template
+from django_mc import mixins
+from django_mc.mixins import TemplateHintProvider, TemplateNameProvider
+
+
+class Hints(TemplateHintProvider):
+    def __init__(self, *hints):
+        self.hints = list(hints)
+
+    def get_template_hints(self, name_provider, hint_providers):
+        return self.hints
+
+
+class Teaser(TemplateNameProvider):
+    def __init__(self, pk=1):
+        self.pk = pk
+
+    def get_app_label(self):
+        return 'app'
+
+    def get_model_name(self):
+        return 'teaser'
+
+
+class NumberedTeaser(Teaser):
+    template_name = '{{app_label}}/{{object_name}}_{{object.pk}}{%if hint%}_{{hint}}{%endif%}.html'
+
+
+def test_template_names_are_generated_once_per_hint(monkeypatch):
+    rendered = []
+
+    class CountingTemplate(Template):
+        def render(self, context):
+            rendered.append(context.get('hint'))
+            return super(CountingTemplate, self).render(context)
+
+    monkeypatch.setattr('django.template.Template', CountingTemplate)
+    monkeypatch.setattr(mixins, '_compiled_template_names', {})
+    monkeypatch.setattr(mixins, '_template_name_tables', {})
+
+    hints = [Hints('region-main', 'layout-home')]
+    for pk in (1, 2):
+        assert Teaser(pk).get_template_names(hints, type='partial') == [
+            'app/_teaser_region-main.html',
+            'app/_teaser_layout-home.html',
+            'app/_teaser.html',
+        ]
+    assert rendered == ['region-main', 'layout-home', None]
+
+
+def test_template_names_using_the_object_are_not_cached():
+    hints = [Hints('main')]
+    assert NumberedTeaser(1).get_template_names(hints) == [
+        'app/teaser_1_main.html', 'app/teaser_1.html']
+    assert NumberedTeaser(2).get_template_names(hints) == [
+        'app/teaser_2_main.html', 'app/teaser_2.html']
+
+
+def test_object_variable_is_detected_once_per_template_name(monkeypatch):
+    searched = []
+
+    class CountingRegex(object):
+        def search(self, template_name):
+            searched.append(template_name)
+            return mixins.re.search(r'\bobject\b', template_name)
+
+    monkeypatch.setattr(mixins, 'OBJECT_VARIABLE_REGEX', CountingRegex())
+    monkeypatch.setattr(mixins, '_compiled_template_names', {})
+    hints = [Hints('main')]
+    for pk in (1, 2):
+        NumberedTeaser(pk).get_template_names(hints)
+        Teaser(pk).get_template_names(hints)
+    assert sorted(searched) == sorted([NumberedTeaser.template_name, Teaser.template_name])
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django_mc import query_budget as query_budget_module
+from django_mc.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware
+from django_mc.query_budget import assert_max_queries, query_budget
+from tests.models import Page, TextComponent
+from tests.test_views import get_view
+
+
+def test_components_are_resolved_within_budget(page):
+    view = get_view(page)
+    view.request = RequestFactory().get('/')
+    with assert_max_queries(lambda: view.request._mc_query_budget):
+        regions = view.get_components_for_regions()
+    with assert_max_queries(0):
+        assert all(
+            isinstance(c, TextComponent)
+            for c in regions['sidebar'])
+
+
+def test_budget_violation_lists_repeated_queries(page):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with assert_max_queries(2):
+            for pk in Page.objects.values_list('pk', flat=True):
+                Page.objects.get(pk=pk)
+            for i in range(3):
+                list(TextComponent.objects.filter(pk=i))
+    message = str(excinfo.value)
+    assert message.startswith('5 queries executed, the budget is 2.')
+    assert '\n3x ' in message
+
+
+def test_query_budget_decorator(page, settings):
+    settings.DEBUG = True
+
+    @query_budget
+    def view(request):
+        request._mc_query_budget = 1
+        for i in range(3):
+            list(Page.objects.filter(pk=i))
+
+    with pytest.raises(QueryBudgetExceeded):
+        view(RequestFactory().get('/'))
+
+
+@query_budget
+def expensive_view(request):
+    request._mc_query_budget = 1
+    for i in range(3):
+        list(Page.objects.filter(pk=i))
+    return HttpResponse()
+
+
+def test_query_budget_is_not_checked_in_production(page, settings, monkeypatch):
+    settings.DEBUG = False
+    warnings = []
+    monkeypatch.setattr(
+        query_budget_module.logger, 'warning', lambda *args: warnings.append(args))
+    request = RequestFactory().get('/')
+    QueryBudgetMiddleware().process_request(request)
+    assert getattr(request, '_mc_captured_queries', None) is None
+    expensive_view(RequestFactory().get('/'))
+    assert warnings == []
+
+    monkeypatch.setattr(query_budget_module, 'MC_QUERY_BUDGET_CHECK', True)
+    expensive_view(RequestFactory().get('/'))
+    assert len(warnings) == 1
+
+
+def test_query_budget_middleware_and_decorator(page, settings):
+    settings.DEBUG = True
+    middleware = QueryBudgetMiddleware()
+    request = RequestFactory().get('/')
+    middleware.process_request(request)
+    response = expensive_view(request)
+    assert connection.force_debug_cursor
+    with pytest.raises(QueryBudgetExceeded):
+        middleware.process_response(request, response)
+    assert not connection.force_debug_cursor
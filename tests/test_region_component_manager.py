@@ -0,0 +1,191 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_mc.models import Layout, Region
+from django_mc.signals import region_components_changed
+from tests.models import Page, TextComponent
+
+
+class Receiver(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, sender, provider_ids, region_ids, **kwargs):
+        self.calls.append((sender, provider_ids, region_ids))
+
+
+def data_queries(queries):
+    return [query for query in queries if 'SAVEPOINT' not in query['sql']]
+
+
+def region(slug):
+    return Region.objects.regions_by_slug()[slug]
+
+
+def positions(provider, slug):
+    return [
+        (region_component.component.get_real_instance().text, region_component.position)
+        for region_component in provider.region_components.filter(
+            region=region(slug)).order_by('position', 'pk')]
+
+
+def test_reorder(page):
+    layout = page.layout
+    rows = list(layout.region_components.filter(region=region('sidebar')).order_by('-position'))
+    receiver = Receiver()
+    region_components_changed.connect(receiver)
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            Layout.RegionComponent.objects.reorder(rows, start=10)
+    finally:
+        region_components_changed.disconnect(receiver)
+    assert len(data_queries(queries)) == 2
+    assert positions(layout, 'sidebar') == [
+        ('layout-sidebar-5', 10), ('layout-sidebar-1', 11)]
+    assert receiver.calls == [
+        (Layout.RegionComponent, set([layout.pk]), set([region('sidebar').pk]))]
+
+
+def test_move(page):
+    layout = page.layout
+    rows = list(layout.region_components.filter(region=region('sidebar')).order_by('position'))
+    Layout.RegionComponent.objects.move(rows, region('main'), position=3)
+    assert positions(layout, 'sidebar') == []
+    assert [text for text, position in positions(layout, 'main')] == [
+        'layout-2', 'layout-sidebar-1', 'layout-sidebar-5']
+
+
+def test_copy_to_providers(page):
+    other = Page.objects.create(title='Other', layout=page.layout)
+    third = Page.objects.create(title='Third', layout=page.layout)
+    receiver = Receiver()
+    region_components_changed.connect(receiver)
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            created = Page.RegionComponent.objects.copy_to_providers(
+                page, [other, third.pk, page], replace=True)
+    finally:
+        region_components_changed.disconnect(receiver)
+    assert created == 2
+    # select, select the replaced regions, delete and insert
+    assert len(data_queries(queries)) == 4
+    assert positions(other, 'main') == positions(page, 'main') == [('page-1', 1)]
+    assert positions(third, 'main') == [('page-1', 1)]
+    assert receiver.calls == [
+        (Page.RegionComponent, set([other.pk, third.pk]), set([region('main').pk]))]
+
+
+def test_copy_to_providers_reports_replaced_regions(page):
+    layout = page.layout
+    parent = layout.parent
+    parent.region_components.filter(region=region('sidebar')).delete()
+    receiver = Receiver()
+    region_components_changed.connect(receiver)
+    try:
+        Layout.RegionComponent.objects.copy_to_providers(parent, [layout], replace=True)
+    finally:
+        region_components_changed.disconnect(receiver)
+    assert positions(layout, 'sidebar') == []
+    assert receiver.calls == [
+        (Layout.RegionComponent, set([layout.pk]),
+         set([region('main').pk, region('sidebar').pk]))]
+
+
+def test_copy_to_providers_skips_inherited_components(page):
+    layout = page.layout
+    layout.flatten()
+    other = Layout.objects.create(name='Other', slug='other', parent=layout.parent)
+    created = Layout.RegionComponent.objects.copy_to_providers(layout, [other])
+    assert created == 3
+    assert not other.region_components.filter(inherited=True).exists()
+    assert sorted(other.region_components.values_list('component_id', flat=True)) == sorted(
+        layout.region_components.filter(inherited=False).values_list('component_id', flat=True))
+
+
+def test_insert_position_between_neighbours(page):
+    layout = page.layout
+    manager = Layout.RegionComponent.objects
+    sidebar = region('sidebar')
+    assert manager.insert_position(layout, sidebar) == 5 + manager.position_gap
+    assert manager.insert_position(layout, sidebar, 0) == 1 - manager.position_gap
+    assert manager.insert_position(layout, sidebar, 1) == 3
+    assert manager.insert_position(layout, region('main')) == 2 + manager.position_gap
+
+
+def test_insert_position_spreads_neighbours_without_gap(page):
+    layout = page.layout
+    manager = Layout.RegionComponent.objects
+    sidebar = region('sidebar')
+    manager.reorder(
+        layout.region_components.filter(region=sidebar).order_by('position'),
+        start=1)
+    assert positions(layout, 'sidebar') == [
+        ('layout-sidebar-1', 1), ('layout-sidebar-5', 2)]
+    position = manager.insert_position(layout, sidebar, 1)
+    new_positions = [p for text, p in positions(layout, 'sidebar')]
+    assert new_positions[0] < position < new_positions[1]
+
+
+def test_insert_position_keeps_the_order_across_providers(page):
+    layout = page.layout
+    manager = Layout.RegionComponent.objects
+    main = region('main')
+
+    def add(text, position):
+        layout.region_components.create(
+            region=main, component=TextComponent.objects.create(text=text),
+            position=position)
+
+    def combined():
+        return [text for text, position in sorted(
+            positions(layout.parent, 'main') + positions(layout, 'main'),
+            key=lambda item: item[1])]
+
+    layout.region_components.filter(region=main).update(position=0)
+    add('layout-4', 4)
+    add('layout-5', 5)
+    add('layout-6', 6)
+    assert combined() == [
+        'layout-2', 'parent-1', 'parent-3', 'layout-4', 'layout-5', 'layout-6']
+    add('new', manager.insert_position(layout, main, 2))
+    assert combined() == [
+        'layout-2', 'parent-1', 'parent-3', 'layout-4', 'new', 'layout-5', 'layout-6']
+
+
+def test_move_to_sends_one_signal(page):
+    layout = page.layout
+    manager = Layout.RegionComponent.objects
+    sidebar = region('sidebar')
+    layout.region_components.create(
+        region=sidebar, component=TextComponent.objects.create(text='layout-sidebar-9'),
+        position=9)
+    manager.reorder(
+        layout.region_components.filter(region=sidebar).order_by('position'),
+        start=1)
+    last = layout.region_components.get(region=sidebar, position=3)
+    receiver = Receiver()
+    region_components_changed.connect(receiver)
+    try:
+        manager.move_to(last, 1)
+    finally:
+        region_components_changed.disconnect(receiver)
+    assert [text for text, p in positions(layout, 'sidebar')] == [
+        'layout-sidebar-1', 'layout-sidebar-9', 'layout-sidebar-5']
+    assert receiver.calls == [
+        (Layout.RegionComponent, set([layout.pk]), set([sidebar.pk]))]
+
+
+def test_move_to_and_rebalance(page):
+    layout = page.layout
+    manager = Layout.RegionComponent.objects
+    sidebar = region('sidebar')
+    last = layout.region_components.get(region=sidebar, position=5)
+    with CaptureQueriesContext(connection) as queries:
+        manager.move_to(last, 0)
+    # select the siblings and update one row
+    assert len(data_queries(queries)) == 2
+    assert [text for text, p in positions(layout, 'sidebar')] == [
+        'layout-sidebar-5', 'layout-sidebar-1']
+
+    manager.rebalance(layout, sidebar)
+    assert positions(layout, 'sidebar') == [
+        ('layout-sidebar-5', 0), ('layout-sidebar-1', manager.position_gap)]
@@ -0,0 +1,80 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_mc.admin import RegionForm
+from django_mc.models import Region
+from tests.models import Page, ProxyTextComponent, TextComponent
+
+
+def get_region(slug):
+    return Region.objects.regions_by_slug()[slug]
+
+
+def test_region_accepts_available_components(page):
+    main = get_region('main')
+    main.available_components.add(ContentType.objects.get_for_model(TextComponent))
+    component = TextComponent.objects.all()[0]
+    base_component = TextComponent._base_manager.all()[0]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert main.accepts(component)
+        assert main.accepts(TextComponent)
+        assert main.get_valid_component_models() == [TextComponent]
+        assert not get_region('sidebar').accepts(component)
+        assert get_region('sidebar').get_valid_component_models() == []
+    # the index is built once for all regions
+    assert len(queries) == 2
+    with CaptureQueriesContext(connection) as queries:
+        assert main.accepts(base_component)
+    assert len(queries) == 0
+
+
+def test_available_components_cache_is_cleared_on_change(page):
+    sidebar = get_region('sidebar')
+    assert not sidebar.accepts(TextComponent)
+    content_type = ContentType.objects.get_for_model(TextComponent)
+    sidebar.available_components.add(content_type)
+    assert sidebar.accepts(TextComponent)
+    sidebar.available_components.remove(content_type)
+    assert not sidebar.accepts(TextComponent)
+
+
+def test_region_form_only_accepts_components(page):
+    data = {
+        'name': 'Main',
+        'slug': 'main',
+        'component_extend_rule': Region.COMBINE,
+        'available_components': [
+            ContentType.objects.get_for_model(TextComponent).pk],
+    }
+    assert RegionForm(data, instance=get_region('main')).is_valid()
+    data['available_components'] = [ContentType.objects.get_for_model(Page).pk]
+    form = RegionForm(data, instance=get_region('main'))
+    assert not form.is_valid()
+    assert 'available_components' in form.errors
+
+
+def test_region_form_accepts_proxy_components(page):
+    content_type = ContentType.objects.get_for_model(
+        ProxyTextComponent, for_concrete_model=False)
+    data = {
+        'name': 'Main',
+        'slug': 'main',
+        'component_extend_rule': Region.COMBINE,
+        'available_components': [content_type.pk],
+    }
+    assert RegionForm(data, instance=get_region('main')).is_valid()
+    with CaptureQueriesContext(connection) as queries:
+        assert content_type.pk in Region.objects.component_content_type_ids()
+    assert len(queries) == 0
+
+
+def test_region_accepts_proxy_components(page):
+    main = get_region('main')
+    main.available_components.add(ContentType.objects.get_for_model(
+        ProxyTextComponent, for_concrete_model=False))
+    assert main.get_valid_component_models() == [ProxyTextComponent]
+    assert main.accepts(ProxyTextComponent)
+    assert main.accepts(ProxyTextComponent.objects.all()[0])
+    assert not main.accepts(TextComponent)
+    assert not main.accepts(TextComponent.objects.all()[0])
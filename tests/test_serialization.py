@@ -0,0 +1,81 @@
+import json
+from StringIO import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_mc.models import Layout, Region
+from django_mc.serialization import LayoutImportError, export_layouts, import_layouts
+from tests.models import LinkComponent
+
+
+def export():
+    output = StringIO()
+    export_layouts(output)
+    return output.getvalue()
+
+
+def test_export_layouts(page):
+    lines = [json.loads(line) for line in export().splitlines()]
+    assert [line['type'] for line in lines] == (
+        ['region'] * 2 + ['layout'] * 2 + ['region_component'] * 6)
+    assert lines[2]['slug'] == 'default'
+    assert lines[3] == {
+        'type': 'layout', 'slug': 'home', 'name': 'Home', 'parent': 'default',
+        'flattened': False}
+    assert lines[4] == {
+        'type': 'region_component', 'layout': 'default', 'region': 'main',
+        'component': lines[4]['component'], 'component_type': ['tests', 'textcomponent'],
+        'position': 1, 'inherited': False, 'visible_from': None, 'visible_until': None}
+
+
+def test_import_layouts_round_trip(page):
+    exported = export()
+    Layout.RegionComponent.objects.all().delete()
+    Region.objects.filter(slug='main').update(position=10)
+
+    with CaptureQueriesContext(connection) as queries:
+        counts = import_layouts(exported.splitlines(), batch_size=2)
+    assert counts == {
+        'region': 2, 'layout': 2, 'region_component': 6, 'skipped': 0}
+    # The number of queries doesn't depend on the number of rows.
+    assert len(queries) < 25
+    assert export() == exported
+
+
+def test_import_creates_layouts_and_skips_missing_components(page):
+    exported = export().replace('"home"', '"other"').replace('"Home"', '"Other"')
+    lines = exported.splitlines()
+    record = json.loads(lines[-1])
+    record['component'] = 0
+    lines.append(json.dumps(record))
+
+    counts = import_layouts(lines)
+    assert counts['skipped'] == 1
+    other = Layout.objects.get(slug='other')
+    assert other.parent.slug == 'default'
+    assert sorted(other.region_components.values_list('position', flat=True)) == [1, 2, 5]
+    # the existing layout is kept
+    assert Layout.objects.get(slug='home').region_components.count() == 3
+
+
+def test_import_refuses_components_of_another_type(page):
+    lines = export().splitlines()
+    record = json.loads(lines[-1])
+    record['component'] = LinkComponent.objects.create().pk
+    lines[-1] = json.dumps(record)
+
+    with pytest.raises(LayoutImportError) as excinfo:
+        import_layouts(lines)
+    assert 'is no "tests.textcomponent"' in str(excinfo.value)
+    assert Layout.RegionComponent.objects.count() == 6
+
+
+def test_import_layouts_command(page, tmpdir):
+    path = tmpdir.join('layouts.jsonl')
+    call_command('export_layouts', output=str(path))
+    Layout.RegionComponent.objects.all().delete()
+    output = StringIO()
+    call_command('import_layouts', str(path), stdout=output)
+    assert 'Imported 2 regions, 2 layouts and 6 region components' in output.getvalue()
+    assert Layout.RegionComponent.objects.count() == 6
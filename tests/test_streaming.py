@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from tests.test_views import get_view
+
+
+PAGE_TEMPLATE = (
+    '{% load django_mc_stream_tags %}<h1>{{ page.title }}</h1>'
+    '{% stream_region %}<main>'
+    '{% for component in region.main %}{{ component.text }},{% endfor %}'
+    '</main>{% endstream_region %}'
+    '{% stream_region %}<aside>'
+    '{% for component in region.sidebar %}{{ component.text }},{% endfor %}'
+    '</aside>{% endstream_region %}'
+    '<footer>')
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'page.html': PAGE_TEMPLATE,
+            }),
+        ],
+    },
+}]
+
+
+def get_response(page, **kwargs):
+    view = get_view(page, template_name='page.html', **kwargs)
+    view.request = RequestFactory().get('/')
+    return view.get(view.request)
+
+
+def test_streaming_matches_regular_response(page):
+    with override_settings(TEMPLATES=TEMPLATES):
+        response = get_response(page)
+        response.render()
+        streamed = get_response(page, streaming=True)
+        assert streamed.streaming
+        assert b''.join(streamed.streaming_content) == response.content
+    assert response.content == (
+        b'<h1>Page</h1><main>parent-1,page-1,layout-2,extra,parent-3,</main>'
+        b'<aside>layout-sidebar-1,layout-sidebar-5,</aside><footer>')
+
+
+def test_streaming_resolves_regions_lazily(page):
+    with override_settings(TEMPLATES=TEMPLATES):
+        streamed = get_response(page, streaming=True)
+        chunks = iter(streamed.streaming_content)
+        with CaptureQueriesContext(connection) as queries:
+            assert next(chunks) == b'<h1>Page</h1>'
+        assert len(queries) == 0
+        with CaptureQueriesContext(connection) as queries:
+            assert next(chunks) == (
+                b'<main>parent-1,page-1,layout-2,extra,parent-3,</main>')
+        assert len(queries) > 0
+        assert list(chunks) == [
+            b'<aside>layout-sidebar-1,layout-sidebar-5,</aside>', b'<footer>']
@@ -0,0 +1,64 @@
+from django.test.utils import override_settings
+from django_mc.template_index import TemplateIndex
+
+
+def override_templates(loaders, dirs=()):
+    return override_settings(TEMPLATES=[{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [str(d) for d in dirs],
+        'OPTIONS': {'loaders': loaders},
+    }])
+
+
+def test_index_prunes_missing_templates(tmpdir):
+    tmpdir.join('app', '_text.html').write('text', ensure=True)
+    tmpdir.join('app', '_text_region-main.html').write('main', ensure=True)
+    loaders = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+        ]),
+    ]
+    with override_templates(loaders, dirs=[tmpdir]):
+        index = TemplateIndex()
+        assert index.filter([
+            'app/_text_layout-home.html',
+            'app/_text_region-main.html',
+            'app/_text.html',
+        ]) == ['app/_text_region-main.html', 'app/_text.html']
+        # Let the loaders report the missing templates.
+        assert index.filter(['app/_missing.html']) == ['app/_missing.html']
+
+        tmpdir.join('app', '_text_layout-home.html').write('home')
+        index.last_check = 0
+        index.directory_mtimes[str(tmpdir.join('app'))] = 0
+        with override_settings(DEBUG=True):
+            assert index.filter(['app/_text_layout-home.html', 'app/_text.html']) == [
+                'app/_text_layout-home.html', 'app/_text.html']
+
+
+def test_index_is_not_used_with_other_loaders():
+    loaders = [
+        ('django.template.loaders.locmem.Loader', {'app/_text.html': 'text'}),
+    ]
+    with override_templates(loaders):
+        index = TemplateIndex()
+        assert index.filter(['app/_text_region-main.html', 'app/_text.html']) == [
+            'app/_text_region-main.html', 'app/_text.html']
+
+
+def test_index_follows_symlinked_directories(tmpdir):
+    shared = tmpdir.mkdir('shared')
+    shared.join('_text_region-main.html').write('main')
+    templates = tmpdir.mkdir('templates')
+    templates.join('app').mksymlinkto(shared)
+    loaders = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+        ]),
+    ]
+    with override_templates(loaders, dirs=[templates]):
+        index = TemplateIndex()
+        assert index.filter([
+            'app/_text_layout-home.html',
+            'app/_text_region-main.html',
+        ]) == ['app/_text_region-main.html']
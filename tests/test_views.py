@@ -0,0 +1,78 @@
+from django.template import Context, Template
+from django_mc.generic.pageview import PageView
+from django_mc.models import Region
+from django_mc.views import RegionComponentList
+
+
+class ExtraComponent(object):
+    def __init__(self, text, position=0):
+        self.text = text
+        self.position = position
+
+    def resolve_component(self):
+        return self
+
+
+def get_view(page, **kwargs):
+    view = PageView(**kwargs)
+    view.object = page
+    view.layout = page.layout
+    view.add_extra_component('main', ExtraComponent('extra', position=2))
+    return view
+
+
+def describe(regions):
+    return dict(
+        (slug, [c.text for c in components])
+        for slug, components in regions.items())
+
+
+def test_database_ordering_matches_python_ordering(page):
+    expected = describe(get_view(page).get_components_for_regions())
+    assert expected == {
+        'main': ['parent-1', 'page-1', 'layout-2', 'extra', 'parent-3'],
+        'sidebar': ['layout-sidebar-1', 'layout-sidebar-5'],
+    }
+    view = get_view(page, database_ordering=True)
+    assert describe(view.get_components_for_regions()) == expected
+
+
+def test_region_component_list_wraps_components():
+    region = Region(name='Main', slug='main')
+    components = [ExtraComponent('a'), ExtraComponent('b')]
+    region_components = RegionComponentList(region, components)
+    assert region_components.data is components
+    assert len(region_components) == 2
+    assert region_components[1] is components[1]
+    assert list(region_components) == components
+    assert not hasattr(region_components, '__dict__')
+
+    template = Template('{% for c in list %}{{ c.text }}{% endfor %}{{ list.0.text }}')
+    assert template.render(Context({'list': region_components})) == 'aba'
+
+
+def test_region_component_list_skips_unresolved_components():
+    region = Region(name='Main', slug='main')
+    region_components = RegionComponentList(region, [None, ExtraComponent('a')])
+    assert [c.text for c in region_components] == ['a']
+
+
+def test_components_are_prepared_once_per_class():
+    class Prepared(ExtraComponent):
+        batches = []
+
+        @classmethod
+        def prepare_batch(cls, components, request_context):
+            cls.batches.append(([c.text for c in components], request_context))
+
+    view = PageView()
+    context = {'page': None}
+    regions = {
+        'main': RegionComponentList(None, [Prepared('a'), ExtraComponent('b')]),
+        'sidebar': RegionComponentList(None, [Prepared('c')]),
+    }
+    view.prepare_components(regions, context)
+    assert len(Prepared.batches) == 1
+    texts, request_context = Prepared.batches[0]
+    assert sorted(texts) == ['a', 'c']
+    assert request_context is context
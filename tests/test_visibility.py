@@ -0,0 +1,123 @@
+from datetime import timedelta
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_mc import models
+from django_mc.models import Layout, Region
+from tests.test_views import describe, get_view
+
+
+@pytest.fixture
+def region_component_cache(request, monkeypatch):
+    monkeypatch.setattr(models, 'MC_REGION_COMPONENT_CACHE', 'default')
+    models.connect_region_components_cache(Layout.RegionComponent)
+    cache.clear()
+
+    def finalize():
+        models.disconnect_region_components_cache(Layout.RegionComponent)
+        cache.clear()
+    request.addfinalizer(finalize)
+    return cache
+
+
+def sidebar_rows(layout):
+    return layout.region_components.filter(
+        region__slug='sidebar').order_by('position')
+
+
+def test_visible_respects_visibility_window(page):
+    now = timezone.now()
+    layout = page.layout
+    first, second = sidebar_rows(layout)
+    Layout.RegionComponent.objects.filter(pk=first.pk).update(
+        visible_until=now - timedelta(minutes=1))
+    Layout.RegionComponent.objects.filter(pk=second.pk).update(
+        visible_from=now - timedelta(minutes=1), visible_until=now + timedelta(hours=1))
+    assert describe(get_view(page).get_components_for_regions()) == {
+        'main': ['parent-1', 'page-1', 'layout-2', 'extra', 'parent-3'],
+        'sidebar': ['layout-sidebar-5'],
+    }
+
+    Layout.RegionComponent.objects.filter(pk=second.pk).update(
+        visible_from=now + timedelta(minutes=1))
+    assert describe(get_view(page).get_components_for_regions()) == {
+        'main': ['parent-1', 'page-1', 'layout-2', 'extra', 'parent-3'],
+        'sidebar': ['parent-sidebar'],
+    }
+
+
+def test_next_visibility_change(page):
+    now = timezone.now()
+    layout = page.layout
+    first, second = sidebar_rows(layout)
+    assert layout.region_components.next_visibility_change() is None
+
+    Layout.RegionComponent.objects.filter(pk=first.pk).update(
+        visible_from=now - timedelta(days=1), visible_until=now + timedelta(hours=2))
+    Layout.RegionComponent.objects.filter(pk=second.pk).update(
+        visible_from=now + timedelta(hours=3))
+    with CaptureQueriesContext(connection) as queries:
+        change = layout.region_components.next_visibility_change()
+    assert len(queries) == 1
+    assert change == now + timedelta(hours=2)
+
+
+def test_cache_expires_at_next_visibility_change(page, region_component_cache, monkeypatch):
+    now = timezone.now()
+    layout = page.layout
+    first, second = sidebar_rows(layout)
+    Layout.RegionComponent.objects.filter(pk=second.pk).update(
+        visible_from=now + timedelta(minutes=10))
+    timeouts = []
+    set_cache = region_component_cache.set
+    monkeypatch.setattr(
+        region_component_cache, 'set',
+        lambda key, value, timeout: timeouts.append(timeout) or set_cache(key, value, timeout))
+
+    regions = layout.get_components_by_region()
+    assert [rc.pk for rc in regions[first.region_id]] == [first.pk]
+    assert 595 < timeouts[0] <= 600
+    with CaptureQueriesContext(connection) as queries:
+        assert [rc.pk for rc in layout.get_components_by_region()[first.region_id]] == [first.pk]
+    assert len(queries) == 0
+
+
+def test_cache_is_cleared_on_change(page, region_component_cache):
+    layout = page.layout
+    first, second = sidebar_rows(layout)
+    assert len(layout.get_components_by_region()[first.region_id]) == 2
+
+    first.visible_until = timezone.now()
+    first.save()
+    assert len(layout.get_components_by_region()[first.region_id]) == 1
+
+    first.delete()
+    assert [rc.pk for rc in layout.get_components_by_region()[first.region_id]] == [second.pk]
+
+    Layout.RegionComponent.objects.move([second], Region.objects.regions_by_slug()['main'])
+    assert first.region_id not in layout.get_components_by_region()
+
+
+def test_region_components_are_fast_deleted_without_cache(page):
+    with CaptureQueriesContext(connection) as queries:
+        Layout.RegionComponent.objects.all().delete()
+    queries = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+    assert len(queries) == 1
+    assert 'DELETE' in queries[0]
+
+
+def test_bulk_replace_clears_the_cache(page, region_component_cache):
+    layout = page.layout
+    parent = layout.parent
+
+    def component_ids(provider):
+        return sorted(
+            region_component.component_id
+            for region_components in provider.get_components_by_region().values()
+            for region_component in region_components)
+
+    assert component_ids(layout) != component_ids(parent)
+    Layout.RegionComponent.objects.copy_to_providers(parent, [layout], replace=True)
+    assert component_ids(layout) == component_ids(parent)
@@ -0,0 +1,60 @@
+from StringIO import StringIO
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_mc import models
+from django_mc.models import Layout
+from django_mc import warmup
+from django_mc.warmup import warm_providers
+
+
+@pytest.fixture
+def region_component_cache(request, monkeypatch):
+    monkeypatch.setattr(models, 'MC_REGION_COMPONENT_CACHE', 'default')
+    cache.clear()
+    request.addfinalizer(cache.clear)
+    return cache
+
+
+def test_warm_providers(page, region_component_cache):
+    progress = []
+    count = warm_providers(
+        ['django_mc.Layout', 'tests.Page'], chunk_size=1,
+        progress=lambda done, total: progress.append((done, total)))
+    assert count == 3
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    with CaptureQueriesContext(connection) as queries:
+        for provider in list(Layout.objects.all()) + [page]:
+            provider.get_components_by_region()
+    # only the objects themselves are fetched
+    assert len(queries) == 1
+
+
+def test_warm_django_mc_command(page, region_component_cache, monkeypatch):
+    monkeypatch.setattr(warmup, 'is_shared_cache', lambda cache: True)
+    output = StringIO()
+    call_command('warm_django_mc', 'tests.Page', stdout=output)
+    assert output.getvalue().splitlines() == [
+        'Warmed 2/3 objects.',
+        'Warmed 3/3 objects.',
+        'Warmed the region components of 3 objects.',
+    ]
+    with pytest.raises(CommandError):
+        call_command('warm_django_mc', 'tests.TextComponent', stdout=StringIO())
+
+
+def test_warm_django_mc_needs_cache(page):
+    with pytest.raises(CommandError):
+        call_command('warm_django_mc', stdout=StringIO())
+
+
+def test_warming_needs_a_shared_cache(page, region_component_cache):
+    assert not warmup.is_shared_cache(models.get_region_component_cache())
+    with pytest.raises(CommandError) as excinfo:
+        call_command('warm_django_mc', stdout=StringIO())
+    assert 'LocMemCache' in str(excinfo.value)
+    with pytest.raises(ImproperlyConfigured):
+        warm_providers(['tests.Page', 'django_mc.Layout'], processes=2)